@@ -0,0 +1,241 @@
+"""
+Module: bench_doctors
+
+Benchmarks the Doctors Without Orders solvers on reproducible, randomly
+generated rosters, and writes the results as JSON so runs can be compared.
+
+Usage:
+    python bench_doctors.py [--sizes 4,8,16] [--kinds easy,tight] [--solvers ...]
+                            [--seeds N] [--timeout SECONDS] [--output FILE]
+                            [--baseline FILE]
+
+Each run is done in a separate process, so a solver that blows up on a
+roster is stopped after --timeout seconds (and recorded as a timeout), and
+one that raises an error or crashes is recorded as such, without holding up
+or losing the rest of the benchmark.
+"""
+
+from argparse import ArgumentParser
+from multiprocessing import Pipe, Process
+import json
+import platform
+import random
+import sys
+import time
+
+import doctors
+from doctors import Doctor, Patient, SearchStats
+
+# the kinds of roster generate_roster can make
+KINDS = ["easy", "tight", "infeasible", "identical"]
+
+# name -> function with the can_schedule_all signature (and a stats keyword)
+SOLVERS = {
+    "can_schedule_all": doctors.can_schedule_all,
+    "backtrack": lambda d, p, s, stats: doctors.can_schedule_all(d, p, s, dp=False, stats=stats),
+    "largest_first": lambda d, p, s, stats: doctors.can_schedule_all(d, p, s, dp=False, largest_first=True,
+                                                                     stats=stats),
+    "memo": doctors.can_schedule_all_memo,
+    "grouped": doctors.can_schedule_all_grouped,
+    "iterative": doctors.can_schedule_all_iterative,
+    "dp": doctors.can_schedule_all_dp,
+    "parallel": doctors.can_schedule_all_parallel,
+}
+
+# solvers that are only run when asked for by name: the DP needs memory
+# exponential in the number of patients, and the pool's startup time swamps
+# small rosters
+OPT_IN_SOLVERS = {"dp", "parallel"}
+
+
+def generate_roster(kind: str, num_doctors: int, seed: int) -> tuple[list[Doctor], list[Patient]]:
+    """
+    Makes a random roster of the given kind. The same arguments always give
+    the same roster.
+
+    Parameters:
+        kind (str): one of KINDS:
+            "easy": patients need about 60% of the doctors' hours
+            "tight": patients need exactly all of the doctors' hours, and a
+                schedule exists (each doctor's hours were split into patients)
+            "infeasible": a tight roster with one patient needing an extra hour
+            "identical": 8 hour doctors and 1 or 2 hour patients, filling
+                every hour
+        num_doctors (int): how many doctors the roster has
+        seed (int): seed for the random choices
+
+    Returns:
+        (tuple[list[Doctor], list[Patient]]): The doctors and the patients.
+    """
+    rng = random.Random(f"{kind}/{num_doctors}/{seed}")
+
+    if kind == "identical":
+        doctor_hours = [8] * num_doctors
+    else:
+        doctor_hours = [rng.randint(6, 12) for _ in range(num_doctors)]
+
+    patient_hours = []
+    if kind == "easy":
+        budget = int(0.6 * sum(doctor_hours))
+        while budget > 0:
+            patient_hours.append(min(budget, rng.randint(1, 5)))
+            budget -= patient_hours[-1]
+    else:
+        # split every doctor's hours into patients, so that everyone fits
+        largest = 2 if kind == "identical" else 6
+        for hours in doctor_hours:
+            while hours > 0:
+                patient_hours.append(min(hours, rng.randint(1, largest)))
+                hours -= patient_hours[-1]
+        rng.shuffle(patient_hours)
+        if kind == "infeasible":
+            patient_hours[rng.randrange(len(patient_hours))] += 1
+
+    docs = [Doctor(f"Doctor {i}", h) for i, h in enumerate(doctor_hours)]
+    patients = [Patient(f"Patient {i}", h) for i, h in enumerate(patient_hours)]
+    return docs, patients
+
+
+def run_case(solver: str, kind: str, num_doctors: int, seed: int) -> dict:
+    """Generates one roster and times one solver on it, returning a record
+    of the result, the seconds taken and the search's counters."""
+    docs, patients = generate_roster(kind, num_doctors, seed)
+    schedule: dict[Doctor, set[Patient]] = {d: set() for d in docs}
+    stats = SearchStats()
+
+    started = time.perf_counter()
+    found = SOLVERS[solver](docs, patients, schedule, stats=stats)
+    elapsed = time.perf_counter() - started
+
+    return {"solver": solver, "kind": kind, "doctors": num_doctors, "patients": len(patients),
+            "seed": seed, "feasible": found, "seconds": elapsed, "nodes": stats.nodes,
+            "backtracks": stats.backtracks, "pruned": stats.pruned}
+
+
+def run_benchmarks(solvers: list[str], kinds: list[str], sizes: list[int], seeds: int,
+                   timeout: float) -> list[dict]:
+    """Runs every combination of solver, kind, size and seed, each in its
+    own process that is given <timeout> seconds."""
+    results = []
+    for kind in kinds:
+        for size in sizes:
+            for seed in range(seeds):
+                for solver in solvers:
+                    record = run_isolated(solver, kind, size, seed, timeout)
+                    results.append(record)
+                    print(_describe(record), file=sys.stderr)
+    return results
+
+
+def run_isolated(solver: str, kind: str, num_doctors: int, seed: int, timeout: float) -> dict:
+    """
+    Runs run_case in a new process, stopping it after <timeout> seconds.
+
+    The process isn't a daemon (unlike a multiprocessing.Pool worker), so
+    solvers can start process pools of their own.
+
+    Returns:
+        (dict): run_case's record, or the case with a "timeout" (the seconds
+            it was given) or an "error" (what went wrong) instead.
+    """
+    case = {"solver": solver, "kind": kind, "doctors": num_doctors, "seed": seed}
+    receiver, sender = Pipe(duplex=False)
+    process = Process(target=_send_case, args=(sender, solver, kind, num_doctors, seed))
+    process.start()
+    sender.close()
+    try:
+        if not receiver.poll(timeout):
+            return {**case, "timeout": timeout}
+        try:
+            return receiver.recv()
+        except EOFError:
+            # the process died without sending anything (killed, say)
+            process.join()
+            return {**case, "error": f"process exited with code {process.exitcode}"}
+    finally:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+        receiver.close()
+
+
+def _send_case(conn, solver: str, kind: str, num_doctors: int, seed: int) -> None:
+    """The body of run_isolated's process: sends back run_case's record, or
+    the error it raised."""
+    try:
+        record = run_case(solver, kind, num_doctors, seed)
+    except Exception as e:
+        record = {"solver": solver, "kind": kind, "doctors": num_doctors, "seed": seed,
+                  "error": f"{type(e).__name__}: {e}"}
+    conn.send(record)
+    conn.close()
+
+
+def compare(results: list[dict], baseline: list[dict]) -> list[str]:
+    """Describes how the time of each case in <results> changed from the
+    same case in <baseline>."""
+    def key(record):
+        return record["solver"], record["kind"], record["doctors"], record["seed"]
+
+    before = {key(r): r for r in baseline}
+    lines = []
+    for record in results:
+        old = before.get(key(record))
+        if old is None or "seconds" not in old or "seconds" not in record:
+            continue
+        ratio = record["seconds"] / old["seconds"] if old["seconds"] > 0 else float("inf")
+        lines.append(f"{_describe(record)}  ({ratio:.2f}x baseline)")
+    return lines
+
+
+def _describe(record: dict) -> str:
+    """A one-line summary of a benchmark record."""
+    case = f"{record['solver']:>16} {record['kind']:>10} {record['doctors']:>4} doctors seed {record['seed']}"
+    if "timeout" in record:
+        return f"{case}: timed out after {record['timeout']}s"
+    if "error" in record:
+        return f"{case}: failed ({record['error']})"
+    return (f"{case}: {record['seconds']:.6f}s, {record['nodes']} nodes, "
+            f"{'feasible' if record['feasible'] else 'infeasible'}")
+
+
+def main(args: list[str]) -> int:
+    parser = ArgumentParser(description="Benchmarks the Doctors Without Orders solvers.")
+    parser.add_argument("--sizes", default="4,8,16", help="comma separated numbers of doctors")
+    parser.add_argument("--kinds", default=",".join(KINDS), help="comma separated roster kinds")
+    parser.add_argument("--solvers", default=",".join(s for s in SOLVERS if s not in OPT_IN_SOLVERS),
+                        help=f"comma separated solvers, from: {', '.join(SOLVERS)}")
+    parser.add_argument("--seeds", type=int, default=3, help="rosters to generate per kind and size")
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds allowed per run")
+    parser.add_argument("--output", help="file to write the JSON results to (default: stdout)")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    options = parser.parse_args(args)
+
+    solvers = options.solvers.split(",")
+    kinds = options.kinds.split(",")
+    unknown = [s for s in solvers if s not in SOLVERS] + [k for k in kinds if k not in KINDS]
+    if unknown:
+        print(f"Error: unknown solver or kind: {', '.join(unknown)}", file=sys.stderr)
+        return 1
+
+    results = run_benchmarks(solvers, kinds, [int(n) for n in options.sizes.split(",")],
+                             options.seeds, options.timeout)
+    report = {"python": platform.python_version(), "machine": platform.machine(),
+              "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}
+
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump(report, f, indent=1)
+    else:
+        print(json.dumps(report, indent=1))
+
+    if options.baseline:
+        with open(options.baseline) as f:
+            baseline = json.load(f)["results"]
+        for line in compare(results, baseline):
+            print(line, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,116 @@
+"""
+Module: bench_supplies
+
+Benchmarks the Disaster Planning network loaders (including loading from
+load_network's cache) on a large, randomly generated .dst file, and writes
+the results as JSON so runs can be compared.
+
+Usage:
+    python bench_supplies.py [--cities N] [--seed N] [--repeat N] [--output FILE]
+
+The file is a grid of N cities (named like real towns, with spaces in some
+of the names), each listing its right and lower neighbors, the way the
+data files list roads.
+"""
+
+from argparse import ArgumentParser
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+import supplies
+
+# name -> function that loads a .dst file
+LOADERS = {
+    "parse_network_data": supplies.parse_network_data,
+    "read_network_data": supplies.read_network_data,
+    "read_network_data_compiled": lambda filename: supplies.read_network_data(filename, compiled=True),
+    # what read_network_data_compiled saves having to do
+    "parse_and_compile": lambda filename: supplies.compile_network(supplies.parse_network_data(filename)[0]),
+    # these time loading from the cache, which time_loader writes first
+    "load_network_cached": supplies.load_network,
+    "load_network_cached_compiled": lambda filename: supplies.load_network(filename, compiled=True),
+}
+CACHED_LOADERS = {"load_network_cached", "load_network_cached_compiled"}
+
+
+def write_network_file(filename: str, num_cities: int, seed: int) -> None:
+    """
+    Writes a .dst file of about <num_cities> cities in a square grid. The
+    same arguments always give the same file.
+
+    Parameters:
+        filename (str): the file to write
+        num_cities (int): roughly how many cities the network has
+        seed (int): seed for the random names and the dropped roads
+    """
+    rng = random.Random(f"{num_cities}/{seed}")
+    width = max(1, round(num_cities ** 0.5))
+    height = -(-num_cities // width)
+
+    def name(x: int, y: int) -> str:
+        return f"Town {x}-{y}" if (x + y) % 3 else f"Port.{x}_{y}"
+
+    with open(filename, "w") as f:
+        f.write(f"# {width} by {height} grid, seed {seed}\n")
+        for y in range(height):
+            for x in range(width):
+                # drop about one road in ten
+                neighbors = [name(nx, ny) for nx, ny in ((x + 1, y), (x, y + 1))
+                             if nx < width and ny < height and rng.random() < 0.9]
+                roads = ": " + ", ".join(neighbors) if neighbors else ":"
+                f.write(f"{name(x, y)} ({x}, {y}){roads}\n")
+
+
+def time_loader(loader: str, filename: str, repeat: int) -> float:
+    """The fastest of <repeat> timed runs of <loader> on <filename>, in seconds.
+    The cached loaders are timed with the cache already written."""
+    if loader in CACHED_LOADERS:
+        supplies.load_network(filename)
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        LOADERS[loader](filename)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(args: list[str]) -> int:
+    parser = ArgumentParser(description="Benchmarks the Disaster Planning network loaders.")
+    parser.add_argument("--cities", type=int, default=20_000, help="how many cities the network has")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the generated network")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per loader (the fastest is kept)")
+    parser.add_argument("--output", help="file to write the JSON results to (default: stdout)")
+    options = parser.parse_args(args)
+
+    fd, filename = tempfile.mkstemp(suffix=".dst")
+    os.close(fd)
+    try:
+        write_network_file(filename, options.cities, options.seed)
+        results = {loader: time_loader(loader, filename, options.repeat) for loader in LOADERS}
+    finally:
+        for leftover in (filename, filename + supplies.NETWORK_CACHE_SUFFIX):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+    baseline = results["parse_network_data"]
+    for loader, seconds in results.items():
+        print(f"{loader:>28}: {seconds:.4f}s ({baseline / seconds:.2f}x parse_network_data)", file=sys.stderr)
+
+    report = {"python": platform.python_version(), "machine": platform.machine(),
+              "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "cities": options.cities,
+              "seed": options.seed, "seconds": results}
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump(report, f, indent=1)
+    else:
+        print(json.dumps(report, indent=1))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,171 +1,1400 @@
-"""
-Module: doctors
-
-An application to solve the Doctors Without Orders problem.
-
-Authors:
-1. Chloe Ogamba
-2. Melissa Vargas
-"""
-
-from sys import argv, exit
-from dataclasses import dataclass
-
-def hour_or_hours(num_hours: int) -> str:
-    """Helper function to get correct pluralization."""
-    assert num_hours >= 0
-    return "hour" if num_hours == 1 else "hours"
-
-
-@dataclass(frozen=True)
-class Doctor:
-    """A representation of a Doctor, including their name and the maximum
-    available hours for scheduling (max_hours).
-
-    Doctors are immutable (i.e. can't change any of their two attributes).
-
-    DO NOT MODIFY THIS CLASS IN ANY WAY!!!
-
-    >>> dr_sat = Doctor("Sat Garcia", 7)
-    >>> dr_sat.name
-    'Sat Garcia'
-    >>> dr_sat.max_hours
-    7
-    >>> dr_sat.max_hours = 11
-    Traceback (most recent call last):
-        ...
-    dataclasses.FrozenInstanceError: cannot assign to field 'max_hours'
-    """
-    name: str
-    max_hours: int
-
-    def __str__(self) -> str:
-        h = hour_or_hours(self.max_hours)
-        return f"Doctor {self.name} ({self.max_hours} {h})"
-
-
-@dataclass(frozen=True)
-class Patient:
-    """A representation of a Patient, including their name and the number of
-    hours they need to be seen for (needed_hours).
-
-    Patients are immutable (i.e. can't change any of their two attributes).
-
-    DO NOT MODIFY THIS CLASS IN ANY WAY!!!
-
-    >>> ouchy = Patient("Ben Hurt", 3)
-    >>> ouchy.name
-    'Ben Hurt'
-    >>> ouchy.needed_hours
-    3
-    >>> ouchy.needed_hours = 1
-    Traceback (most recent call last):
-        ...
-    dataclasses.FrozenInstanceError: cannot assign to field 'needed_hours'
-    """
-    name: str
-    needed_hours: int
-
-    def __str__(self) -> str:
-        h = hour_or_hours(self.needed_hours)
-        return f"Patient {self.name} ({self.needed_hours} {h})"
-
-
-def parse_scheduling_data(filename: str) -> tuple[list[Doctor], list[Patient]]:
-    """
-    Reads the doctor and patient data from <filename>, returning a list of
-    Doctors and and a list of Patients.
-
-    DO NOT MODIFY THIS FUNCTION IN ANY WAY!!!
-
-    Parameters:
-        filename (str): Name of the file containing doctor and patient info.
-
-    Returns:
-        (tuple[list[Doctor], list[Patient]]): Two lists: the first of doctors
-            and the second of patients, gathered from the specified file.
-    """
-    docs = []
-    patients = []
-
-    with open(filename, 'r') as f:
-        all_lines = f.readlines()
-
-        i = 0
-        while i < len(all_lines) and (all_lines[i][0] == '#' or
-                                      all_lines[i].strip() == ""):
-            i += 1
-
-        for line_num in range(i, len(all_lines)):
-            line = all_lines[line_num]
-            person_info, hours = line.split(':')
-            person_split = person_info.split()
-            title = person_split[0]
-            name = " ".join(person_split[1:])
-
-            if title == "Doctor":
-                docs.append(Doctor(name, int(hours)))
-            else:
-                patients.append(Patient(name, int(hours)))
-
-    return docs, patients
-
-
-def can_schedule_all(doctors: list[Doctor], patients: list[Patient], schedule: dict[Doctor, set[Patient]]) -> bool:
-    """
-    Deciding which patient gos to which doctor based on the doctor's max hours 
-    that they can work and the amount of hours the patient needs.
-
-    Parameters:
-        doctors (list): contains all of the information from the doctor's class
-        patients (list): contains all of the information from the patient's class
-        schedule (dictionary): contains the doctor's information and the patient/patients that the doctor can attend to
-
-    Returns:
-        (bool): True if the doctor and patient match and False if they don't
-    """
-    if len(patients)==0: #if we don't have any patients
-        return True # the doctor can still work the the max amout of hours
-    for doctor in doctors: # looping through our doctors list
-        doctorz = doctor.max_hours # get the doctors maz hours
-        patientz = patients[0].needed_hours # get patients needed hours
-        
-        untouched = schedule[doctor]
-        for touching in untouched:
-             
-            doctorz -= touching.needed_hours #figure out the amount of hours the doctor has left ####
-
-        if doctorz >= patientz:
-            schedule[doctor].add(patients[0]) # adds the first patient to the schedule
-
-            recurs_doctz =can_schedule_all(doctors,patients[1:],schedule) #recursive case
-            if recurs_doctz == True:
-                return True
-            elif recurs_doctz == False: #remove the patient's informationfrom the list, if we are already matched
-                    schedule[doctor].remove(patients[0]) ####
-
-        elif doctorz > patientz: # if doctor hours is greater than the patient needed hours
-            pass
-
-
-    return False
-       
-
-
-if __name__ == "__main__":
-    if len(argv) != 2:
-        print("Error: wrong number of command line parameters")
-        exit(1)
-
-    docs, patients = parse_scheduling_data(argv[1])
-
-    # create initial schedule, with each doctor assigned to no one!
-    proposed_schedule: dict[Doctor, set[Patient]] = {d: set() for d in docs}
-
-    if can_schedule_all(docs, patients, proposed_schedule):
-        print("Proposed schedule:")
-        for doc, docs_patients in proposed_schedule.items():
-            patient_names = ", ".join([str(p) for p in docs_patients])
-            print(f"\t{doc} -> {patient_names}")
-    else:
-        print("No valid schedule possible!")
\ No newline at end of file
+"""
+Module: doctors
+
+An application to solve the Doctors Without Orders problem.
+
+Authors:
+1. Chloe Ogamba
+2. Melissa Vargas
+"""
+
+from sys import intern, maxsize
+from argparse import ArgumentParser
+from array import array
+from collections.abc import Callable
+from dataclasses import dataclass
+from enum import Enum
+from fractions import Fraction
+from heapq import heapify, heappop, heappush
+import os
+import time
+
+from search_stats import (FailureCache, JOBS_PER_WORKER, POLL_INTERVAL, SearchAborted, SearchStats,
+                          first_answer_in_pool, stop_requested)
+
+# can_schedule_all hands rosters of up to DP_MAX_PATIENTS patients to the
+# bitmask DP (whose running time depends only on the roster's size) when the
+# backtracking search hasn't finished within DP_FALLBACK_NODES nodes
+DP_MAX_PATIENTS = 16
+DP_FALLBACK_NODES = 20_000
+
+# can_schedule_all_dp refuses rosters of more patients than this: its two
+# tables take 8 * 2^n bytes each, so 20 patients already need 16 MB, and 30
+# need 16 GB
+DP_LIMIT_PATIENTS = 20
+
+# rosters with at least this many patients are searched without recursion,
+# so they can't run into Python's recursion limit
+ITERATIVE_MIN_PATIENTS = 500
+
+def hour_or_hours(num_hours: int) -> str:
+    """Helper function to get correct pluralization."""
+    assert num_hours >= 0
+    return "hour" if num_hours == 1 else "hours"
+
+
+@dataclass(frozen=True)
+class Doctor:
+    """A representation of a Doctor, including their name and the maximum
+    available hours for scheduling (max_hours).
+
+    Doctors are immutable (i.e. can't change any of their two attributes).
+
+    DO NOT MODIFY THIS CLASS IN ANY WAY!!!
+
+    >>> dr_sat = Doctor("Sat Garcia", 7)
+    >>> dr_sat.name
+    'Sat Garcia'
+    >>> dr_sat.max_hours
+    7
+    >>> dr_sat.max_hours = 11
+    Traceback (most recent call last):
+        ...
+    dataclasses.FrozenInstanceError: cannot assign to field 'max_hours'
+    """
+    name: str
+    max_hours: int
+
+    def __str__(self) -> str:
+        h = hour_or_hours(self.max_hours)
+        return f"Doctor {self.name} ({self.max_hours} {h})"
+
+
+@dataclass(frozen=True)
+class Patient:
+    """A representation of a Patient, including their name and the number of
+    hours they need to be seen for (needed_hours).
+
+    Patients are immutable (i.e. can't change any of their two attributes).
+
+    DO NOT MODIFY THIS CLASS IN ANY WAY!!!
+
+    >>> ouchy = Patient("Ben Hurt", 3)
+    >>> ouchy.name
+    'Ben Hurt'
+    >>> ouchy.needed_hours
+    3
+    >>> ouchy.needed_hours = 1
+    Traceback (most recent call last):
+        ...
+    dataclasses.FrozenInstanceError: cannot assign to field 'needed_hours'
+    """
+    name: str
+    needed_hours: int
+
+    def __str__(self) -> str:
+        h = hour_or_hours(self.needed_hours)
+        return f"Patient {self.name} ({self.needed_hours} {h})"
+
+
+def parse_scheduling_data(filename: str) -> tuple[list[Doctor], list[Patient]]:
+    """
+    Reads the doctor and patient data from <filename>, returning a list of
+    Doctors and and a list of Patients.
+
+    DO NOT MODIFY THIS FUNCTION IN ANY WAY!!!
+
+    Parameters:
+        filename (str): Name of the file containing doctor and patient info.
+
+    Returns:
+        (tuple[list[Doctor], list[Patient]]): Two lists: the first of doctors
+            and the second of patients, gathered from the specified file.
+    """
+    docs = []
+    patients = []
+
+    with open(filename, 'r') as f:
+        all_lines = f.readlines()
+
+        i = 0
+        while i < len(all_lines) and (all_lines[i][0] == '#' or
+                                      all_lines[i].strip() == ""):
+            i += 1
+
+        for line_num in range(i, len(all_lines)):
+            line = all_lines[line_num]
+            person_info, hours = line.split(':')
+            person_split = person_info.split()
+            title = person_split[0]
+            name = " ".join(person_split[1:])
+
+            if title == "Doctor":
+                docs.append(Doctor(name, int(hours)))
+            else:
+                patients.append(Patient(name, int(hours)))
+
+    return docs, patients
+
+
+@dataclass
+class CompactRoster:
+    """Doctors and patients stored as name tables plus parallel arrays of
+    hours, rather than as one Doctor/Patient object per person.
+
+    Doctor i is doctor_names[i] with doctor_hours[i] max hours, and likewise
+    for patients.
+    """
+    doctor_names: list[str]
+    doctor_hours: array
+    patient_names: list[str]
+    patient_hours: array
+
+    def doctors(self) -> list[Doctor]:
+        """Builds the Doctor objects for this roster."""
+        return [Doctor(n, h) for n, h in zip(self.doctor_names, self.doctor_hours)]
+
+    def patients(self) -> list[Patient]:
+        """Builds the Patient objects for this roster."""
+        return [Patient(n, h) for n, h in zip(self.patient_names, self.patient_hours)]
+
+
+def read_scheduling_data(filename: str, compact: bool = False) -> tuple[list[Doctor], list[Patient]] | CompactRoster:
+    """
+    Reads the same format as parse_scheduling_data, but streams the file a
+    line at a time instead of reading it all in, and splits each line only
+    once. Names are interned, and comments and blank lines are skipped
+    wherever they appear (not just at the top).
+
+    Parameters:
+        filename (str): Name of the file containing doctor and patient info.
+        compact (bool): If True, return a CompactRoster instead of building
+            a Doctor or Patient for every line.
+
+    Returns:
+        (tuple[list[Doctor], list[Patient]] | CompactRoster): The doctors and
+            patients from the file, in the form asked for.
+    """
+    roster = CompactRoster([], array('i'), [], array('i'))
+
+    with open(filename, 'r') as f:
+        for line in f:
+            if line[0] == '#' or line.isspace():
+                continue
+            person_info, hours = line.split(':')
+            title, *rest = person_info.split()
+            name = " ".join(rest)
+
+            if title == "Doctor":
+                roster.doctor_names.append(intern(name))
+                roster.doctor_hours.append(int(hours))
+            else:
+                roster.patient_names.append(intern(name))
+                roster.patient_hours.append(int(hours))
+
+    if compact:
+        return roster
+    return roster.doctors(), roster.patients()
+
+
+class ScheduleStatus(Enum):
+    """The outcome of solve_within_budget."""
+    SCHEDULED = "scheduled"     # a valid schedule was found
+    INFEASIBLE = "infeasible"   # proven that no valid schedule exists
+    UNKNOWN = "unknown"         # the budget ran out before either was shown
+
+
+class _ScheduleSearch:
+    """The backtracking core behind can_schedule_all.
+
+    Rather than recomputing each doctor's free time from the schedule and
+    slicing the patient list on every call, the search keeps one array of
+    remaining hours per doctor and walks the patients with an index (the
+    cursor), updating both in place as it assigns and backtracks.
+
+    Parameters:
+        hours (list[int]): Needed hours of each patient, in the order they
+            are to be placed.
+        remaining (list[int]): Free hours of each doctor. Modified in place.
+        symmetry (bool): If True, only one doctor per distinct number of
+            remaining hours is tried at each step, since doctors with the same
+            free time lead to identical subtrees.
+        bounds (bool): If True, give up on a branch as soon as the patients
+            still to be placed provably can't fit in the hours that are left.
+        memo (FailureCache): Optional cache of failed states. Which doctor has
+            which hours left doesn't matter for the rest of the search, so a
+            state is the cursor plus the sorted remaining hours.
+        node_limit (int): SearchAborted is raised if the search visits more
+            nodes than this.
+        stop (Callable[[], bool]): Optional; checked every POLL_INTERVAL
+            nodes, and SearchAborted is raised once it returns True.
+    """
+
+    def __init__(self, hours: list[int], remaining: list[int], symmetry: bool = True,
+                 bounds: bool = True, memo: FailureCache | None = None,
+                 node_limit: int = maxsize, stop: Callable[[], bool] | None = None) -> None:
+        self.hours = hours
+        self.remaining = remaining
+        self.symmetry = symmetry
+        self.bounds = bounds
+        self.memo = memo
+        self.node_limit = node_limit
+        self.stop = stop
+        # the node count at which to next check node_limit and stop
+        self.next_check = min(node_limit, POLL_INTERVAL) if stop else node_limit
+        # assignment[i] is the index of the doctor that patient i went to
+        self.assignment = [-1] * len(hours)
+        self.nodes = 0
+        self.backtracks = 0
+        self.max_depth = 0
+        self.pruned = 0
+
+        # rest_total[i], rest_min[i] and rest_max[i] describe hours[i:], so the
+        # bounds can be checked without rescanning the patients
+        n = len(hours)
+        self.rest_total = [0] * (n + 1)
+        self.rest_min = [0] * (n + 1)
+        self.rest_max = [0] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            h = hours[i]
+            self.rest_total[i] = self.rest_total[i + 1] + h
+            self.rest_min[i] = h if i == n - 1 else min(h, self.rest_min[i + 1])
+            self.rest_max[i] = max(h, self.rest_max[i + 1])
+
+    def solve(self) -> bool:
+        """Returns True (with assignment filled in) if every patient fits."""
+        if len(self.hours) >= ITERATIVE_MIN_PATIENTS:
+            return self.solve_iterative()
+        return self._place(0)
+
+    def solve_iterative(self) -> bool:
+        """Same search as solve, in the same order and with the same node
+        counts, but with an explicit stack of choice points instead of
+        recursion."""
+        hours = self.hours
+        remaining = self.remaining
+        assignment = self.assignment
+        memo = self.memo
+        n = len(hours)
+        num_docs = len(remaining)
+
+        # the choice point for each cursor: the next doctor to try, the free
+        # hours already tried, and the state to record in memo on failure
+        next_doctor = [0] * n
+        tried: list[set[int] | None] = [None] * n
+        states: list[tuple | None] = [None] * n
+
+        cursor = 0
+        entering = True
+        while True:
+            if entering:
+                self.nodes += 1
+                if self.nodes > self.next_check:
+                    self._checkpoint()
+                if cursor > self.max_depth:
+                    self.max_depth = cursor
+                if cursor == n:
+                    return True
+
+                dead_end = False
+                if self.bounds and not self._can_still_fit(cursor):
+                    self.pruned += 1
+                    dead_end = True
+                elif memo is not None:
+                    states[cursor] = (cursor, tuple(sorted(remaining)))
+                    dead_end = states[cursor] in memo
+                if dead_end:
+                    if cursor == 0:
+                        return False
+                    cursor -= 1
+                    entering = False
+                    continue
+
+                next_doctor[cursor] = 0
+                tried[cursor] = set() if self.symmetry else None
+            else:
+                remaining[assignment[cursor]] += hours[cursor] # undo and try the next doctor
+                self.backtracks += 1
+
+            need = hours[cursor]
+            seen = tried[cursor]
+            d = next_doctor[cursor]
+            while d < num_docs:
+                free = remaining[d]
+                if free >= need:
+                    if seen is None:
+                        break
+                    if free not in seen:
+                        seen.add(free)
+                        break
+                d += 1
+
+            if d < num_docs:
+                remaining[d] -= need
+                assignment[cursor] = d
+                next_doctor[cursor] = d + 1
+                cursor += 1
+                entering = True
+            else:
+                if memo is not None:
+                    memo.add(states[cursor])
+                if cursor == 0:
+                    return False
+                cursor -= 1
+                entering = False
+
+    def _checkpoint(self) -> None:
+        """Raises SearchAborted if the search should stop, otherwise works
+        out when to check again."""
+        if self.nodes > self.node_limit or (self.stop is not None and self.stop()):
+            raise SearchAborted
+        if self.stop is not None:
+            self.next_check = min(self.node_limit, self.nodes + POLL_INTERVAL)
+        else:
+            self.next_check = self.node_limit
+
+    def _can_still_fit(self, cursor: int) -> bool:
+        """Bin-packing style lower bounds on the patients from <cursor> on.
+
+        Hours a doctor has left that are smaller than the shortest remaining
+        patient can never be used, so they don't count towards the capacity
+        available for the hours still needed. For the same reason a doctor
+        with f hours free can see at most f // shortest more patients. The
+        longest remaining patient must also fit with at least one doctor.
+        """
+        smallest = self.rest_min[cursor]
+        if smallest <= 0:
+            return True # patients needing no time fit anywhere
+        usable = 0
+        slots = 0
+        most = 0
+        for free in self.remaining:
+            if free >= smallest:
+                usable += free
+                slots += free // smallest
+                if free > most:
+                    most = free
+        return (usable >= self.rest_total[cursor] and most >= self.rest_max[cursor]
+                and slots >= len(self.hours) - cursor)
+
+    def _place(self, cursor: int) -> bool:
+        """Tries to place patients[cursor:], given the current remaining hours."""
+        self.nodes += 1
+        if self.nodes > self.next_check:
+            self._checkpoint()
+        if cursor > self.max_depth:
+            self.max_depth = cursor
+        if cursor == len(self.hours):
+            return True
+        if self.bounds and not self._can_still_fit(cursor):
+            self.pruned += 1
+            return False
+
+        remaining = self.remaining
+        memo = self.memo
+        if memo is not None:
+            state = (cursor, tuple(sorted(remaining)))
+            if state in memo:
+                return False
+
+        need = self.hours[cursor]
+        tried = set() if self.symmetry else None
+        for d in range(len(remaining)):
+            free = remaining[d]
+            if free >= need:
+                if tried is not None:
+                    if free in tried:
+                        continue # same subtree as a doctor we already tried
+                    tried.add(free)
+                remaining[d] = free - need
+                self.assignment[cursor] = d
+                if self._place(cursor + 1):
+                    return True
+                remaining[d] += need # undo and try the next doctor
+                self.backtracks += 1
+
+        if memo is not None:
+            memo.add(state)
+        return False
+
+    def report(self, stats: SearchStats) -> None:
+        """Adds this search's counters to <stats>."""
+        stats.nodes += self.nodes
+        stats.backtracks += self.backtracks
+        stats.max_depth = max(stats.max_depth, self.max_depth)
+        stats.pruned += self.pruned
+        if self.memo is not None:
+            stats.cache_hits += self.memo.hits
+            stats.cache_misses += self.memo.misses
+
+
+class _GroupedSearch:
+    """A search over groups of patients who need the same number of hours.
+
+    Patients needing the same hours are interchangeable, so instead of
+    branching on each one, the search decides how many patients of each group
+    every doctor takes. Groups are placed longest first.
+
+    Parameters:
+        groups (list[tuple[int, int]]): (needed hours, number of patients)
+            pairs, one per distinct number of hours, longest first.
+        remaining (list[int]): Free hours of each doctor. Modified in place.
+    """
+
+    def __init__(self, groups: list[tuple[int, int]], remaining: list[int]) -> None:
+        self.groups = groups
+        self.remaining = remaining
+        # counts[g][d] is how many patients of group g go to doctor d
+        self.counts = [[0] * len(remaining) for _ in groups]
+        # each doctor's free hours when we started on a group
+        self.group_start = [[] for _ in groups]
+        self.nodes = 0
+        self.backtracks = 0
+        self.max_depth = 0
+        self.pruned = 0
+
+        # rest_total[g] is the number of hours needed by groups g onwards
+        self.rest_total = [0] * (len(groups) + 1)
+        for g in range(len(groups) - 1, -1, -1):
+            hours, count = groups[g]
+            self.rest_total[g] = self.rest_total[g + 1] + hours * count
+
+    def solve(self) -> bool:
+        """Returns True (with counts filled in) if every group fits."""
+        return self._start_group(0)
+
+    def _start_group(self, g: int) -> bool:
+        if g > self.max_depth:
+            self.max_depth = g
+        if g == len(self.groups):
+            return True
+
+        # the shortest patients are in the last group; hours smaller than
+        # that can't be used by anyone
+        shortest = self.groups[-1][0]
+        # (a doctor already booked past their hours has none free, not fewer)
+        if sum(max(free, 0) for free in self.remaining if free >= shortest) < self.rest_total[g]:
+            self.pruned += 1
+            return False
+
+        hours, count = self.groups[g]
+        self.group_start[g] = list(self.remaining)
+        return self._fill(g, 0, count)
+
+    def _fill(self, g: int, d: int, left: int) -> bool:
+        """Hands out the <left> patients of group g to doctors d onwards."""
+        self.nodes += 1
+        if left == 0:
+            return self._start_group(g + 1)
+
+        hours = self.groups[g][0]
+        remaining = self.remaining
+        if d == len(remaining):
+            return False
+        if hours == 0:
+            # patients needing no time fit anywhere but with a doctor already
+            # booked past their hours, as for everyone else
+            most = left if remaining[d] >= 0 else 0
+        elif sum(max(free, 0) // hours for free in remaining[d:]) < left:
+            self.pruned += 1
+            return False
+        else:
+            most = min(left, max(remaining[d], 0) // hours)
+
+        start = self.group_start[g]
+        if d > 0 and start[d] == start[d - 1]:
+            # doctors that had the same hours free are interchangeable, so
+            # only consider splits where the earlier one takes at least as many
+            most = min(most, self.counts[g][d - 1])
+
+        for k in range(most, -1, -1):
+            remaining[d] -= k * hours
+            self.counts[g][d] = k
+            if self._fill(g, d + 1, left - k):
+                return True
+            remaining[d] += k * hours
+            self.backtracks += 1
+
+        self.counts[g][d] = 0
+        return False
+
+    def report(self, stats: SearchStats) -> None:
+        """Adds this search's counters to <stats> (its depth is in groups)."""
+        stats.nodes += self.nodes
+        stats.backtracks += self.backtracks
+        stats.max_depth = max(stats.max_depth, self.max_depth)
+        stats.pruned += self.pruned
+
+
+def _dp_assignment(hours: list[int], remaining: list[int], stats: SearchStats | None = None) -> list[int] | None:
+    """
+    Solves the scheduling problem with a DP over subsets of patients.
+
+    Doctors are filled in a fixed order, so the state reached after placing
+    the patients in a subset (a bitmask) can be summed up as (k, used): the
+    doctor currently being filled and how many of their hours are taken.
+    Reaching a subset with a smaller k, or the same k and fewer hours used,
+    is never worse, so only that best state is kept per subset. States are
+    packed into one int, k * width + used, and kept in flat arrays, along
+    with the total hours of every subset.
+
+    Parameters:
+        hours (list[int]): Needed hours of each patient.
+        remaining (list[int]): Free hours of each doctor.
+        stats (SearchStats): optional, counts the subsets that were expanded
+            (nodes) and those cut off by the capacity bound (pruned)
+
+    Returns:
+        (list[int] | None): The doctor index for every patient, or None if
+            they can't all be scheduled.
+    """
+    n = len(hours)
+    num_docs = len(remaining)
+    if n == 0:
+        return []
+    if num_docs == 0:
+        return None
+
+    width = max(max(remaining), 0) + 1
+    unreached = num_docs * width
+    start = -1 # no patients placed, no doctor being filled yet
+
+    # next_fit[k + 1][i] is the first doctor after k with room for patient i
+    next_fit = [[num_docs] * n for _ in range(num_docs + 1)]
+    for i, h in enumerate(hours):
+        for k in range(num_docs - 1, -1, -1):
+            next_fit[k][i] = k if remaining[k] >= h else next_fit[k + 1][i]
+
+    # capacity_after[k] is the total free hours of the doctors after k (a
+    # doctor already booked past their hours has none free, not fewer)
+    capacity_after = [0] * num_docs
+    for k in range(num_docs - 2, -1, -1):
+        capacity_after[k] = capacity_after[k + 1] + max(remaining[k + 1], 0)
+
+    def step(state: int, i: int) -> int:
+        """The state after adding patient i, or unreached if they don't fit."""
+        k, used = divmod(state, width) if state != start else (-1, 0)
+        h = hours[i]
+        if k >= 0 and used + h <= remaining[k]:
+            return state + h
+        j = next_fit[k + 1][i]
+        return j * width + h if j < num_docs else unreached
+
+    full = (1 << n) - 1
+    total_needed = sum(hours)
+    total = array('q', bytes(8 << n))
+    best = array('q', [unreached]) * (1 << n)
+    best[0] = start
+    expanded = 0
+    pruned = 0
+
+    for mask in range(full):
+        if mask:
+            low = mask & -mask
+            total[mask] = total[mask ^ low] + hours[low.bit_length() - 1]
+        state = best[mask]
+        if state == unreached:
+            continue
+        if state != start:
+            # the patients not in mask must fit in what's left of the current
+            # doctor plus all the doctors after them
+            k, used = divmod(state, width)
+            if total_needed - total[mask] > remaining[k] - used + capacity_after[k]:
+                pruned += 1
+                continue
+        expanded += 1
+
+        for i in range(n):
+            bit = 1 << i
+            if not mask & bit:
+                new_state = step(state, i)
+                if new_state < best[mask | bit]:
+                    best[mask | bit] = new_state
+        if best[full] != unreached:
+            break # any way of placing everyone will do
+
+    if stats is not None:
+        stats.nodes += expanded
+        stats.pruned += pruned
+        stats.max_depth = max(stats.max_depth, n if best[full] != unreached else 0)
+    if best[full] == unreached:
+        return None
+
+    # walk back from the full set, each time finding a patient whose removal
+    # gives a subset that leads to this one; the state says who took them
+    assignment = [-1] * n
+    mask = full
+    while mask:
+        state = best[mask]
+        for i in range(n):
+            bit = 1 << i
+            if mask & bit and best[mask ^ bit] != unreached and step(best[mask ^ bit], i) == state:
+                assignment[i] = state // width
+                mask ^= bit
+                break
+    return assignment
+
+
+def _remaining_hours(doctors: list[Doctor], schedule: dict[Doctor, set[Patient]]) -> list[int]:
+    """Returns how many hours each doctor still has free, taking into account
+    the patients that are already in their schedule."""
+    return [d.max_hours - sum(p.needed_hours for p in schedule[d]) for d in doctors]
+
+
+def can_schedule_all(doctors: list[Doctor], patients: list[Patient], schedule: dict[Doctor, set[Patient]],
+                     *, symmetry: bool = True, bounds: bool = True, largest_first: bool = False,
+                     dp: bool | None = None, stats: SearchStats | None = None) -> bool:
+    """
+    Deciding which patient gos to which doctor based on the doctor's max hours 
+    that they can work and the amount of hours the patient needs.
+
+    Parameters:
+        doctors (list): contains all of the information from the doctor's class
+        patients (list): contains all of the information from the patient's class
+        schedule (dictionary): contains the doctor's information and the patient/patients that the doctor can attend to
+        symmetry (bool): skip doctors whose remaining hours match a doctor
+            already tried for the same patient (turn off to compare node counts)
+        bounds (bool): reject rosters (and branches) whose remaining patients
+            can't fit in the remaining hours, before searching them
+        largest_first (bool): place the patients needing the most hours first
+        dp (bool | None): True to use can_schedule_all_dp (which raises
+            ValueError above DP_LIMIT_PATIENTS patients), False to always
+            backtrack; None (the default) switches to the DP for rosters of
+            up to DP_MAX_PATIENTS patients that the search doesn't solve quickly
+        stats (SearchStats): optional, filled in with the search's counters
+
+    Returns:
+        (bool): True if the doctor and patient match and False if they don't
+    """
+    if dp is None and len(patients) <= DP_MAX_PATIENTS:
+        # most small rosters are settled by the search long before the DP
+        # would finish, so only give the search a small budget
+        try:
+            return _schedule_with(doctors, patients, schedule, largest_first, stats,
+                                  symmetry=symmetry, bounds=bounds, node_limit=DP_FALLBACK_NODES)
+        except SearchAborted:
+            dp = True
+
+    if dp:
+        return can_schedule_all_dp(doctors, patients, schedule, stats=stats)
+    return _schedule_with(doctors, patients, schedule, largest_first, stats,
+                          symmetry=symmetry, bounds=bounds)
+
+
+def can_schedule_all_memo(doctors: list[Doctor], patients: list[Patient], schedule: dict[Doctor, set[Patient]],
+                          *, cache_size: int = 100_000, symmetry: bool = True, bounds: bool = True,
+                          largest_first: bool = False, stats: SearchStats | None = None) -> bool:
+    """
+    Same as can_schedule_all, but remembers which states (next patient plus
+    the multiset of remaining doctor hours) have already failed, so reaching
+    one again by a different path costs a single lookup.
+
+    Parameters:
+        doctors, patients, schedule: as for can_schedule_all
+        cache_size (int): most failed states to remember; the least recently
+            used ones are forgotten first
+        symmetry, bounds, largest_first: as for can_schedule_all
+        stats (SearchStats): optional, also gets the cache's hit/miss counts
+
+    Returns:
+        (bool): True if every patient could be scheduled
+    """
+    return _schedule_with(doctors, patients, schedule, largest_first, stats,
+                          symmetry=symmetry, bounds=bounds, memo=FailureCache(cache_size))
+
+
+def can_schedule_all_dp(doctors: list[Doctor], patients: list[Patient], schedule: dict[Doctor, set[Patient]],
+                        *, stats: SearchStats | None = None) -> bool:
+    """
+    Same as can_schedule_all, but solved with a dynamic program over subsets
+    of patients. It takes O(2^n * n) time and space for n patients whatever
+    the hours are, so it only takes rosters of up to DP_LIMIT_PATIENTS.
+
+    Parameters:
+        doctors, patients, schedule: as for can_schedule_all
+        stats (SearchStats): optional, its node count gets the number of
+            patient subsets expanded
+
+    Returns:
+        (bool): True if every patient could be scheduled
+
+    Raises:
+        ValueError: if there are more than DP_LIMIT_PATIENTS patients
+    """
+    if len(patients) > DP_LIMIT_PATIENTS:
+        raise ValueError(f"can_schedule_all_dp takes at most {DP_LIMIT_PATIENTS} patients, not {len(patients)}")
+    started = time.perf_counter()
+    assignment = _dp_assignment([p.needed_hours for p in patients],
+                                _remaining_hours(doctors, schedule), stats)
+    if stats is not None:
+        stats.add_time("dp", time.perf_counter() - started)
+    if assignment is None:
+        return False
+
+    for patient, d in zip(patients, assignment):
+        schedule[doctors[d]].add(patient)
+    return True
+
+
+def can_schedule_all_iterative(doctors: list[Doctor], patients: list[Patient], schedule: dict[Doctor, set[Patient]],
+                               *, symmetry: bool = True, bounds: bool = True, largest_first: bool = False,
+                               stats: SearchStats | None = None) -> bool:
+    """
+    Same as can_schedule_all with dp=False, but always uses the non-recursive
+    version of the search. It visits the same nodes in the same order and
+    produces the same schedule; can_schedule_all switches to it on its own
+    for rosters of ITERATIVE_MIN_PATIENTS or more.
+
+    Parameters:
+        doctors, patients, schedule, symmetry, bounds, largest_first, stats:
+            as for can_schedule_all
+
+    Returns:
+        (bool): True if every patient could be scheduled
+    """
+    return _schedule_with(doctors, patients, schedule, largest_first, stats, iterative=True,
+                          symmetry=symmetry, bounds=bounds)
+
+
+def can_schedule_all_grouped(doctors: list[Doctor], patients: list[Patient], schedule: dict[Doctor, set[Patient]],
+                             *, stats: SearchStats | None = None) -> bool:
+    """
+    Same as can_schedule_all, but treats patients who need the same number of
+    hours as one group and decides how many of each group every doctor gets.
+    Rosters with many same-length appointments have far fewer distinct
+    choices this way.
+
+    Parameters:
+        doctors, patients, schedule: as for can_schedule_all
+        stats (SearchStats): optional, filled in with the search's counters
+
+    Returns:
+        (bool): True if every patient could be scheduled
+    """
+    by_hours: dict[int, list[Patient]] = {}
+    for p in patients:
+        by_hours.setdefault(p.needed_hours, []).append(p)
+    needed = sorted(by_hours, reverse=True)
+
+    search = _GroupedSearch([(h, len(by_hours[h])) for h in needed],
+                            _remaining_hours(doctors, schedule))
+    started = time.perf_counter()
+    found = search.solve()
+    if stats is not None:
+        search.report(stats)
+        stats.add_time("search", time.perf_counter() - started)
+    if not found:
+        return False
+
+    # turn the per-group counts back into concrete patients
+    for h, counts in zip(needed, search.counts):
+        group = iter(by_hours[h])
+        for d, k in enumerate(counts):
+            for _ in range(k):
+                schedule[doctors[d]].add(next(group))
+    return True
+
+
+def schedule_compact(roster: CompactRoster, *, largest_first: bool = False,
+                     stats: SearchStats | None = None) -> list[int] | None:
+    """
+    Runs the can_schedule_all search directly on a CompactRoster, without
+    building any Doctor or Patient objects.
+
+    Parameters:
+        roster (CompactRoster): the doctors and patients to schedule
+        largest_first (bool): place the patients needing the most hours first
+        stats (SearchStats): optional, filled in with the search's counters
+
+    Returns:
+        (list[int] | None): The index (in roster.doctor_names) of the doctor
+            each patient is scheduled with, or None if there's no valid schedule.
+    """
+    order = list(range(len(roster.patient_hours)))
+    if largest_first:
+        order.sort(key=roster.patient_hours.__getitem__, reverse=True)
+
+    search = _ScheduleSearch([roster.patient_hours[i] for i in order], list(roster.doctor_hours))
+    started = time.perf_counter()
+    found = search.solve()
+    if stats is not None:
+        search.report(stats)
+        stats.add_time("search", time.perf_counter() - started)
+    if not found:
+        return None
+
+    assignment = [-1] * len(order)
+    for i, d in zip(order, search.assignment):
+        assignment[i] = d
+    return assignment
+
+
+def can_schedule_all_parallel(doctors: list[Doctor], patients: list[Patient], schedule: dict[Doctor, set[Patient]],
+                              *, workers: int | None = None, symmetry: bool = True, bounds: bool = True,
+                              largest_first: bool = False, stats: SearchStats | None = None) -> bool:
+    """
+    Same as can_schedule_all, but spread over a pool of processes. The first
+    few patients are assigned in every possible way (up to symmetry), and
+    each of those partial schedules is searched as a separate job. As soon as
+    one job finds a full schedule, the others are stopped.
+
+    Parameters:
+        doctors, patients, schedule: as for can_schedule_all
+        workers (int): number of processes (defaults to the number of CPUs)
+        symmetry, bounds, largest_first: as for can_schedule_all
+        stats (SearchStats): optional, gets the counters summed over all jobs
+
+    Returns:
+        (bool): True if every patient could be scheduled
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if largest_first:
+        patients = sorted(patients, key=lambda p: p.needed_hours, reverse=True)
+    hours = [p.needed_hours for p in patients]
+
+    jobs, depth = _split_search(hours, _remaining_hours(doctors, schedule), JOBS_PER_WORKER * workers, symmetry)
+    assignment = None
+    if depth == len(hours):
+        assignment = jobs[0][0] if jobs else None
+    elif jobs:
+        job_stats = SearchStats()
+        found = first_answer_in_pool(_search_subtree, [(hours[depth:], free_hours, symmetry, bounds)
+                                                       for _, free_hours in jobs], workers, job_stats)
+        if stats is not None:
+            # the jobs' depths start below the patients already placed
+            stats.merge(job_stats, depth_offset=depth)
+        if found is not None:
+            index, rest = found
+            assignment = jobs[index][0] + rest
+
+    if assignment is None:
+        return False
+    for patient, d in zip(patients, assignment):
+        schedule[doctors[d]].add(patient)
+    return True
+
+
+def _split_search(hours: list[int], remaining: list[int], min_jobs: int,
+                  symmetry: bool) -> tuple[list[tuple[list[int], list[int]]], int]:
+    """
+    Expands the top of the search tree one patient at a time until there are
+    at least <min_jobs> partial schedules (or every patient is placed).
+
+    Returns:
+        (tuple[list[tuple[list[int], list[int]]], int]): The partial schedules,
+            each as (doctor index of every placed patient, remaining hours),
+            in the order the serial search would visit them, and the number
+            of patients they place.
+    """
+    jobs = [([], remaining)]
+    depth = 0
+    while jobs and len(jobs) < min_jobs and depth < len(hours):
+        need = hours[depth]
+        expanded = []
+        for prefix, free_hours in jobs:
+            tried = set()
+            for d, free in enumerate(free_hours):
+                if free < need or (symmetry and free in tried):
+                    continue
+                tried.add(free)
+                child = list(free_hours)
+                child[d] -= need
+                expanded.append((prefix + [d], child))
+        jobs = expanded
+        depth += 1
+    return jobs, depth
+
+
+def _search_subtree(hours: list[int], remaining: list[int], symmetry: bool,
+                    bounds: bool) -> tuple[list[int] | None, SearchStats]:
+    """Runs one job of can_schedule_all_parallel in a worker process.
+
+    Returns:
+        (tuple[list[int] | None, SearchStats]): The assignment of <hours>
+            (None if there is none or the job was stopped), and the job's
+            counters.
+    """
+    search = _ScheduleSearch(hours, remaining, symmetry, bounds, stop=stop_requested)
+    started = time.perf_counter()
+    try:
+        found = search.solve()
+    except SearchAborted:
+        found = False
+    stats = SearchStats()
+    search.report(stats)
+    stats.add_time("search", time.perf_counter() - started)
+    return (search.assignment if found else None), stats
+
+
+def solve_within_budget(doctors: list[Doctor], patients: list[Patient], schedule: dict[Doctor, set[Patient]],
+                        *, time_limit: float | None = None, node_limit: int | None = None,
+                        stats: SearchStats | None = None) -> ScheduleStatus:
+    """
+    Tries to schedule every patient without going over a time or node budget.
+
+    A first-fit-decreasing pass (longest patients first, each to the first
+    doctor with room) is tried first, since it settles most rosters at once.
+    If it fails, the exact search runs, largest first, until it finishes or
+    the budget runs out.
+
+    Parameters:
+        doctors, patients, schedule: as for can_schedule_all
+        time_limit (float): seconds the exact search may run for (no limit if None)
+        node_limit (int): nodes the exact search may visit (no limit if None)
+        stats (SearchStats): optional, filled in with the search's counters
+
+    Returns:
+        (ScheduleStatus): SCHEDULED (and schedule is filled in), INFEASIBLE,
+            or UNKNOWN if the budget ran out first.
+    """
+    patients = sorted(patients, key=lambda p: p.needed_hours, reverse=True)
+    hours = [p.needed_hours for p in patients]
+    remaining = _remaining_hours(doctors, schedule)
+
+    started = time.perf_counter()
+    assignment = _first_fit(hours, list(remaining))
+    if stats is not None:
+        stats.add_time("greedy", time.perf_counter() - started)
+    if assignment is None:
+        stop = None
+        if time_limit is not None:
+            deadline = time.perf_counter() + time_limit
+
+            def stop() -> bool:
+                return time.perf_counter() > deadline
+
+        search = _ScheduleSearch(hours, remaining, node_limit=maxsize if node_limit is None else node_limit,
+                                 stop=stop)
+        started = time.perf_counter()
+        try:
+            found = search.solve()
+        except SearchAborted:
+            return ScheduleStatus.UNKNOWN
+        finally:
+            if stats is not None:
+                search.report(stats)
+                stats.add_time("search", time.perf_counter() - started)
+        if not found:
+            return ScheduleStatus.INFEASIBLE
+        assignment = search.assignment
+
+    for patient, d in zip(patients, assignment):
+        schedule[doctors[d]].add(patient)
+    return ScheduleStatus.SCHEDULED
+
+
+class _BalancedSearch:
+    """Branch-and-bound for the schedule whose busiest doctor (as a fraction
+    of their max hours) is as idle as possible.
+
+    Patients are placed longest first, and each is tried with the doctors
+    that would end up least loaded first. A branch is cut off as soon as the
+    load it already has is no better than the best complete schedule found so
+    far (the incumbent), which starts out as a greedy schedule. The search
+    also stops early if the incumbent reaches the average load, since no
+    schedule can do better than that.
+
+    Doctors already booked past their max hours can't take anyone, and no
+    schedule changes how busy they are, so their loads are left out.
+
+    Parameters:
+        hours (list[int]): Needed hours of each patient, longest first.
+        used (list[int]): Hours each doctor already has scheduled. Modified
+            in place during the search.
+        capacity (list[int]): Max hours of each doctor.
+        stop (Callable[[], bool]): Optional; checked every POLL_INTERVAL
+            nodes, and SearchAborted is raised once it returns True (the
+            best schedule so far is then still in best_assignment).
+    """
+
+    def __init__(self, hours: list[int], used: list[int], capacity: list[int],
+                 stop: Callable[[], bool] | None = None) -> None:
+        self.hours = hours
+        self.used = used
+        self.capacity = capacity
+        self.stop = stop
+        self.next_check = POLL_INTERVAL
+        self.assignment = [-1] * len(hours)
+        self.best_load = float("inf")
+        self.best_assignment: list[int] | None = None
+        self.nodes = 0
+        self.backtracks = 0
+        self.max_depth = 0
+        self.pruned = 0
+
+        # the doctors whose loads count: those not booked past their hours
+        self.open = [d for d in range(len(used)) if used[d] <= capacity[d]]
+        self.floor = self._lowest_load(sum(used[d] for d in self.open) + sum(hours))
+
+    def _lowest_load(self, needed: int) -> float:
+        """The lowest load any schedule's busiest doctor could have: the
+        smallest L such that doctors working whole hours, each at most L of
+        their max hours, have <needed> hours between them. That is the
+        average load, or a bit more when the hours don't divide evenly (e.g.
+        2000 hours over 30 doctors of 70 hours needs 67/70, not 66.67/70)."""
+        caps = [self.capacity[d] for d in self.open if self.capacity[d] > 0]
+        total = sum(caps)
+        if needed == 0 or needed > total:
+            return needed / total if total > 0 else 0.0
+
+        # at the average load each doctor has this many whole hours, and L is
+        # the highest of those loads, or whichever loads the last few of the
+        # <needed> hours push doctors up to
+        counts = [needed * c // total for c in caps]
+        lowest = max(Fraction(n, c) for n, c in zip(counts, caps))
+        upgrades = [(Fraction(n + 1, c), i) for i, (n, c) in enumerate(zip(counts, caps))]
+        heapify(upgrades)
+        for _ in range(needed - sum(counts)):
+            load, i = heappop(upgrades)
+            lowest = max(lowest, load)
+            counts[i] += 1
+            heappush(upgrades, (Fraction(counts[i] + 1, caps[i]), i))
+        return float(lowest)
+
+    def load(self, d: int, extra: int = 0) -> float:
+        """How busy doctor d would be with <extra> more hours (0 to 1)."""
+        busy = self.used[d] + extra
+        if self.capacity[d] > 0:
+            return busy / self.capacity[d]
+        return 0.0 if busy == 0 else float("inf")
+
+    def solve(self) -> bool:
+        """Finds the best schedule, returning False if there is none."""
+        self._greedy()
+        worst = max((self.load(d) for d in self.open), default=0.0)
+        if self.best_load > self.floor:
+            self._place(worst)
+        return self.best_assignment is not None
+
+    def _greedy(self) -> None:
+        """Sets the incumbent to the schedule made by giving each patient to
+        whoever would be least loaded afterwards."""
+        used = list(self.used)
+        assignment = []
+        for h in self.hours:
+            options = [d for d in range(len(used)) if used[d] + h <= self.capacity[d]]
+            if not options:
+                return
+            d = min(options, key=lambda d: (used[d] + h) / self.capacity[d] if self.capacity[d] else 0.0)
+            used[d] += h
+            assignment.append(d)
+
+        self.best_assignment = assignment
+        self.best_load = max((self.load(d, used[d] - self.used[d]) for d in self.open), default=0.0)
+
+    def _place(self, worst: float) -> None:
+        """Tries to improve on the incumbent by placing every patient, given
+        that the busiest doctor so far has load <worst>.
+
+        Like _ScheduleSearch.solve_iterative, this keeps an explicit stack of
+        choice points (the options left at each cursor) rather than
+        recursing once per patient, so big rosters can't overflow Python's
+        stack."""
+        hours = self.hours
+        used = self.used
+        assignment = self.assignment
+        n = len(hours)
+
+        # for each cursor: its options, the next one to try, and the load of
+        # the busiest doctor on reaching it
+        options: list[list[tuple[float, int]]] = [[] for _ in range(n)]
+        next_option = [0] * n
+        worsts = [0.0] * (n + 1)
+        worsts[0] = worst
+
+        cursor = 0
+        entering = True
+        while True:
+            if entering:
+                self.nodes += 1
+                if self.stop is not None and self.nodes >= self.next_check:
+                    self.next_check += POLL_INTERVAL
+                    if self.stop():
+                        raise SearchAborted
+                if cursor > self.max_depth:
+                    self.max_depth = cursor
+                if cursor == n:
+                    self.best_load = worsts[n]
+                    self.best_assignment = list(assignment)
+                    if cursor == 0:
+                        return
+                    cursor -= 1
+                    entering = False
+                    continue
+
+                need = hours[cursor]
+                choices = []
+                tried = set()
+                for d in range(len(used)):
+                    if used[d] + need > self.capacity[d] or (used[d], self.capacity[d]) in tried:
+                        continue
+                    tried.add((used[d], self.capacity[d])) # same hours used and free: same subtree
+                    choices.append((max(worsts[cursor], self.load(d, need)), d))
+                choices.sort()
+                options[cursor] = choices
+                next_option[cursor] = 0
+            else:
+                used[assignment[cursor]] -= hours[cursor] # undo and try the next option
+                self.backtracks += 1
+                if self.best_load <= self.floor:
+                    # can't do better than the average, so unwind everything
+                    if cursor == 0:
+                        return
+                    cursor -= 1
+                    continue
+
+            i = next_option[cursor]
+            if i < len(options[cursor]):
+                load, d = options[cursor][i]
+                if load < self.best_load:
+                    next_option[cursor] = i + 1
+                    used[d] += hours[cursor]
+                    assignment[cursor] = d
+                    worsts[cursor + 1] = load
+                    cursor += 1
+                    entering = True
+                    continue
+                self.pruned += 1 # the rest of the options are no better
+
+            # no options left here, so go back to the previous patient
+            if cursor == 0:
+                return
+            cursor -= 1
+            entering = False
+
+    def report(self, stats: SearchStats) -> None:
+        """Adds this search's counters to <stats>."""
+        stats.nodes += self.nodes
+        stats.backtracks += self.backtracks
+        stats.max_depth = max(stats.max_depth, self.max_depth)
+        stats.pruned += self.pruned
+
+
+class IncrementalScheduler:
+    """A schedule that is kept valid as patients are added and removed.
+
+    New patients are placed with cheap local repairs: straight into the
+    doctor with the least time to spare that still has room, or else by
+    moving one already scheduled patient to another doctor to make room.
+    Only when both fail is the whole roster searched again.
+
+    >>> scheduler = IncrementalScheduler([Doctor("Sat", 5), Doctor("Mel", 3)])
+    >>> scheduler.add_patient(Patient("Ben", 3)), scheduler.add_patient(Patient("Ann", 4))
+    (True, True)
+    >>> sorted(p.name for p in scheduler.schedule[Doctor("Sat", 5)])
+    ['Ann']
+    >>> scheduler.add_patient(Patient("Cal", 2))
+    False
+    >>> scheduler.remove_patient(Patient("Ben", 3))
+    >>> scheduler.add_patient(Patient("Cal", 2))
+    True
+    """
+
+    def __init__(self, doctors: list[Doctor]) -> None:
+        self.doctors = list(doctors)
+        self.schedule: dict[Doctor, set[Patient]] = {d: set() for d in self.doctors}
+        self.full_searches = 0 # how many updates needed a full search
+        self._remaining = {d: d.max_hours for d in self.doctors}
+        self._doctor_of: dict[Patient, Doctor] = {}
+
+    def __contains__(self, patient: Patient) -> bool:
+        return patient in self._doctor_of
+
+    def add_patient(self, patient: Patient) -> bool:
+        """
+        Schedules <patient>, rearranging the others if needed.
+
+        Returns:
+            (bool): True if they were scheduled, False if there is no valid
+                schedule with them (the schedule is then left as it was).
+        """
+        if patient in self._doctor_of:
+            raise ValueError(f"{patient} is already scheduled")
+        need = patient.needed_hours
+
+        doctor = self._best_fit(need)
+        if doctor is None:
+            doctor = self._make_room(need)
+        if doctor is not None:
+            self._assign(patient, doctor)
+            return True
+
+        # no local repair works, so search from scratch with everyone
+        self.full_searches += 1
+        patients = list(self._doctor_of) + [patient]
+        schedule = {d: set() for d in self.doctors}
+        if not can_schedule_all(self.doctors, patients, schedule, largest_first=True):
+            return False
+
+        self.schedule = schedule
+        self._remaining = {d: d.max_hours - sum(p.needed_hours for p in ps) for d, ps in schedule.items()}
+        self._doctor_of = {p: d for d, ps in schedule.items() for p in ps}
+        return True
+
+    def remove_patient(self, patient: Patient) -> None:
+        """Takes <patient> out of the schedule (KeyError if they aren't in it)."""
+        doctor = self._doctor_of.pop(patient)
+        self.schedule[doctor].remove(patient)
+        self._remaining[doctor] += patient.needed_hours
+
+    def _assign(self, patient: Patient, doctor: Doctor) -> None:
+        self._doctor_of[patient] = doctor
+        self.schedule[doctor].add(patient)
+        self._remaining[doctor] -= patient.needed_hours
+
+    def _best_fit(self, need: int, exclude: Doctor | None = None) -> Doctor | None:
+        """The doctor (other than <exclude>) with the fewest free hours that
+        still has at least <need>, or None."""
+        best = None
+        for doctor, free in self._remaining.items():
+            if free >= need and doctor != exclude and (best is None or free < self._remaining[best]):
+                best = doctor
+        return best
+
+    def _make_room(self, need: int) -> Doctor | None:
+        """Tries to free up <need> hours with some doctor by moving one of
+        their patients to a different doctor. Returns the doctor with room
+        (after making the move), or None if no single move does it."""
+        for doctor, free in self._remaining.items():
+            for moved in self.schedule[doctor]:
+                if free + moved.needed_hours < need:
+                    continue
+                target = self._best_fit(moved.needed_hours, exclude=doctor)
+                if target is not None:
+                    self.remove_patient(moved)
+                    self._assign(moved, target)
+                    return doctor
+        return None
+
+
+def schedule_balanced(doctors: list[Doctor], patients: list[Patient], schedule: dict[Doctor, set[Patient]],
+                      *, time_limit: float | None = None, stats: SearchStats | None = None) -> bool:
+    """
+    Like can_schedule_all, but rather than stopping at the first valid
+    schedule, finds the one where the busiest doctor (as a fraction of their
+    max hours) is as idle as possible. The search is exponential in the
+    worst case, like can_schedule_all, so a time limit can be given, after
+    which the most balanced schedule found so far is used.
+
+    Parameters:
+        doctors, patients, schedule: as for can_schedule_all
+        time_limit (float): optional, seconds after which to stop improving
+            the schedule
+        stats (SearchStats): optional, filled in with the search's counters
+
+    Returns:
+        (bool): True if every patient could be scheduled (False if they
+            can't be, or if no schedule was found within <time_limit>)
+    """
+    stop = None
+    if time_limit is not None:
+        deadline = time.perf_counter() + time_limit
+        stop = lambda: time.perf_counter() >= deadline
+    patients = sorted(patients, key=lambda p: p.needed_hours, reverse=True)
+    search = _BalancedSearch([p.needed_hours for p in patients],
+                             [sum(p.needed_hours for p in schedule[d]) for d in doctors],
+                             [d.max_hours for d in doctors], stop)
+    started = time.perf_counter()
+    try:
+        found = search.solve()
+    except SearchAborted:
+        found = search.best_assignment is not None
+    if stats is not None:
+        search.report(stats)
+        stats.add_time("search", time.perf_counter() - started)
+    if not found:
+        return False
+
+    for patient, d in zip(patients, search.best_assignment):
+        schedule[doctors[d]].add(patient)
+    return True
+
+
+def _first_fit(hours: list[int], remaining: list[int]) -> list[int] | None:
+    """Gives each patient, in order, to the first doctor with enough hours
+    left, returning the assignment (or None if someone doesn't fit)."""
+    assignment = []
+    for need in hours:
+        for d, free in enumerate(remaining):
+            if free >= need:
+                remaining[d] = free - need
+                assignment.append(d)
+                break
+        else:
+            return None
+    return assignment
+
+
+def _schedule_with(doctors: list[Doctor], patients: list[Patient], schedule: dict[Doctor, set[Patient]],
+                   largest_first: bool, stats: SearchStats | None, iterative: bool = False, **options) -> bool:
+    """Runs a _ScheduleSearch with <options> (iteratively if asked to) and
+    copies its assignment into <schedule> if it succeeded."""
+    if largest_first:
+        patients = sorted(patients, key=lambda p: p.needed_hours, reverse=True)
+
+    search = _ScheduleSearch([p.needed_hours for p in patients],
+                             _remaining_hours(doctors, schedule), **options)
+    started = time.perf_counter()
+    try:
+        found = search.solve_iterative() if iterative else search.solve()
+    finally:
+        if stats is not None:
+            search.report(stats)
+            stats.add_time("search", time.perf_counter() - started)
+    if not found:
+        return False
+
+    # only touch the caller's schedule once we know everyone fits
+    for patient, d in zip(patients, search.assignment):
+        schedule[doctors[d]].add(patient)
+    return True
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Solves the Doctors Without Orders problem.")
+    parser.add_argument("filename", help="file with the doctor and patient info")
+    parser.add_argument("--time-limit", type=float, metavar="SECONDS",
+                        help="give up (and report that it's unknown) after this long")
+    parser.add_argument("--balanced", action="store_true",
+                        help="find the schedule that spreads the work most evenly (with --time-limit, "
+                             "the most even one found in time)")
+    parser.add_argument("--stats", action="store_true", help="print statistics about the search")
+    args = parser.parse_args()
+
+    stats = SearchStats() if args.stats else None
+    started = time.perf_counter()
+    docs, patients = parse_scheduling_data(args.filename)
+    if stats is not None:
+        stats.add_time("parse", time.perf_counter() - started)
+
+    # create initial schedule, with each doctor assigned to no one!
+    proposed_schedule: dict[Doctor, set[Patient]] = {d: set() for d in docs}
+
+    if args.balanced:
+        found = schedule_balanced(docs, patients, proposed_schedule, time_limit=args.time_limit, stats=stats)
+        if found:
+            status = ScheduleStatus.SCHEDULED
+        else:
+            status = ScheduleStatus.INFEASIBLE if args.time_limit is None else ScheduleStatus.UNKNOWN
+    elif args.time_limit is not None:
+        status = solve_within_budget(docs, patients, proposed_schedule, time_limit=args.time_limit, stats=stats)
+    elif can_schedule_all(docs, patients, proposed_schedule, stats=stats):
+        status = ScheduleStatus.SCHEDULED
+    else:
+        status = ScheduleStatus.INFEASIBLE
+
+    if status == ScheduleStatus.SCHEDULED:
+        print("Proposed schedule:")
+        for doc, docs_patients in proposed_schedule.items():
+            patient_names = ", ".join([str(p) for p in docs_patients])
+            print(f"\t{doc} -> {patient_names}")
+    elif status == ScheduleStatus.INFEASIBLE:
+        print("No valid schedule possible!")
+    else:
+        print(f"No schedule found within {args.time_limit} seconds (it is unknown whether one exists)")
+
+    if stats is not None:
+        print("Search statistics:")
+        for line in str(stats).splitlines():
+            print(f"\t{line}")
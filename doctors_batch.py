@@ -0,0 +1,110 @@
+"""
+Module: doctors_batch
+
+Solves the Doctors Without Orders problem for many scheduling files at once,
+spread across a pool of processes, printing one JSON record per file as soon
+as it is done.
+
+Usage:
+    python doctors_batch.py [--workers N] [--time-limit SECONDS] PATH [PATH ...]
+
+where each PATH is a scheduling file, a directory of them, or a glob pattern.
+"""
+
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import glob
+import json
+import os
+import sys
+import time
+
+from doctors import (Doctor, Patient, ScheduleStatus, can_schedule_all, read_scheduling_data,
+                     solve_within_budget)
+
+
+def find_files(paths: list[str]) -> list[str]:
+    """
+    Expands <paths> into a sorted list of scheduling files.
+
+    Parameters:
+        paths (list[str]): file names, directories (every file directly
+            inside is used) and glob patterns
+
+    Returns:
+        (list[str]): The files, without duplicates.
+    """
+    found = set()
+    for path in paths:
+        if os.path.isdir(path):
+            found.update(os.path.join(path, name) for name in os.listdir(path)
+                         if os.path.isfile(os.path.join(path, name)))
+        elif os.path.exists(path):
+            found.add(path)
+        else:
+            found.update(p for p in glob.glob(path) if os.path.isfile(p))
+    return sorted(found)
+
+
+def solve_file(filename: str, time_limit: float | None = None) -> dict:
+    """
+    Reads and solves one scheduling file.
+
+    Parameters:
+        filename (str): the scheduling file
+        time_limit (float): if given, solve with solve_within_budget, so the
+            status may come back as "unknown"
+
+    Returns:
+        (dict): A JSON-ready record with the file name, its status
+            ("scheduled", "infeasible", "unknown" or "error"), whether it is
+            feasible, the schedule (doctor name -> patient names, or None),
+            and the seconds it took.
+    """
+    started = time.perf_counter()
+    record = {"file": filename}
+    try:
+        docs, patients = read_scheduling_data(filename)
+        schedule: dict[Doctor, set[Patient]] = {d: set() for d in docs}
+        if time_limit is not None:
+            status = solve_within_budget(docs, patients, schedule, time_limit=time_limit)
+        elif can_schedule_all(docs, patients, schedule):
+            status = ScheduleStatus.SCHEDULED
+        else:
+            status = ScheduleStatus.INFEASIBLE
+    except (OSError, ValueError) as e:
+        record.update(status="error", error=str(e))
+    else:
+        record["status"] = status.value
+        record["feasible"] = None if status == ScheduleStatus.UNKNOWN else status == ScheduleStatus.SCHEDULED
+        record["schedule"] = None
+        if status == ScheduleStatus.SCHEDULED:
+            record["schedule"] = {d.name: sorted(p.name for p in ps) for d, ps in schedule.items()}
+
+    record["elapsed"] = time.perf_counter() - started
+    return record
+
+
+def main(args: list[str]) -> int:
+    parser = ArgumentParser(description="Solves many Doctors Without Orders files, printing JSON lines.")
+    parser.add_argument("paths", nargs="+", help="scheduling files, directories or glob patterns")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of processes (defaults to the number of CPUs)")
+    parser.add_argument("--time-limit", type=float, metavar="SECONDS",
+                        help="give up on a file after this long (its status is then unknown)")
+    options = parser.parse_args(args)
+
+    files = find_files(options.paths)
+    if not files:
+        print("Error: no scheduling files found", file=sys.stderr)
+        return 1
+
+    with ProcessPoolExecutor(options.workers) as pool:
+        futures = [pool.submit(solve_file, f, options.time_limit) for f in files]
+        for future in as_completed(futures):
+            print(json.dumps(future.result()), flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,182 @@
+"""
+Module: search_stats
+
+Counters that the Doctors Without Orders and Disaster Planning solvers fill
+in to describe how much work a search did, the cache of failed search
+states that both of their searches can use, and the process pool both of
+their parallel solvers search in.
+"""
+
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+import multiprocessing
+
+# how many nodes a search visits between checks of its stop condition
+POLL_INTERVAL = 1024
+
+# how many jobs a parallel solver aims to split its search into per worker,
+# so that an unlucky split doesn't leave most of the pool idle
+JOBS_PER_WORKER = 4
+
+
+@dataclass
+class SearchStats:
+    """Counters describing how much work a search did.
+
+    Pass an instance to a solver to have it filled in. Solvers add to the
+    counters, so one instance can also total up several runs.
+
+    >>> stats = SearchStats()
+    >>> stats.nodes
+    0
+    >>> stats.add_time("search", 0.25)
+    >>> stats.add_time("search", 0.5)
+    >>> stats.phase_times
+    {'search': 0.75}
+    """
+    nodes: int = 0          # search nodes (calls) visited
+    backtracks: int = 0     # choices that were undone
+    max_depth: int = 0      # deepest level the search reached
+    pruned: int = 0         # branches cut off by a bound
+    cache_hits: int = 0     # failed states found in a cache
+    cache_misses: int = 0   # states looked up but not found
+    phase_times: dict[str, float] = field(default_factory=dict)  # seconds per phase
+
+    def merge(self, other: "SearchStats", depth_offset: int = 0) -> None:
+        """Adds the counters of <other> (a search that started <depth_offset>
+        levels down) to these ones."""
+        self.nodes += other.nodes
+        self.backtracks += other.backtracks
+        self.max_depth = max(self.max_depth, other.max_depth + depth_offset)
+        self.pruned += other.pruned
+        self.cache_hits += other.cache_hits
+        self.cache_misses += other.cache_misses
+        for phase, seconds in other.phase_times.items():
+            self.add_time(phase, seconds)
+
+    def add_time(self, phase: str, seconds: float) -> None:
+        """Adds <seconds> to the time spent in <phase>."""
+        self.phase_times[phase] = self.phase_times.get(phase, 0.0) + seconds
+
+    def __str__(self) -> str:
+        lines = [f"nodes visited: {self.nodes}",
+                 f"backtracks: {self.backtracks}",
+                 f"max depth: {self.max_depth}",
+                 f"pruned branches: {self.pruned}"]
+        if self.cache_hits or self.cache_misses:
+            lookups = self.cache_hits + self.cache_misses
+            lines.append(f"cache hits: {self.cache_hits} of {lookups} "
+                         f"({100 * self.cache_hits / lookups:.1f}%)")
+        for phase, seconds in self.phase_times.items():
+            lines.append(f"{phase} time: {seconds:.6f}s")
+        return "\n".join(lines)
+
+
+class FailureCache:
+    """A bounded set of search states that are known to lead nowhere.
+
+    Once it holds <max_size> states, adding a new one evicts the state that
+    was least recently added or looked up.
+
+    >>> cache = FailureCache(max_size=2)
+    >>> cache.add("a"); cache.add("b")
+    >>> "a" in cache
+    True
+    >>> cache.add("c")  # "b" is now the least recently used
+    >>> "b" in cache, cache.hits, cache.misses
+    (False, 1, 1)
+    """
+
+    def __init__(self, max_size: int = 100_000) -> None:
+        assert max_size > 0
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._states: OrderedDict = OrderedDict()
+
+    def __contains__(self, state) -> bool:
+        if state in self._states:
+            self._states.move_to_end(state)
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def add(self, state) -> None:
+        """Records <state> as a failure, evicting the oldest one if full."""
+        self._states[state] = None
+        self._states.move_to_end(state)
+        if len(self._states) > self.max_size:
+            self._states.popitem(last=False)
+
+
+class SearchAborted(Exception):
+    """Raised inside a search once it has used up its budget or been told to
+    stop."""
+
+
+def first_answer_in_pool(search: Callable[..., tuple[object, SearchStats]], jobs: list[tuple], workers: int,
+                         stats: SearchStats | None = None, initializer: Callable[..., None] | None = None,
+                         initargs: tuple = ()) -> tuple[int, object] | None:
+    """
+    Runs search(*job) for each of <jobs> in a pool of <workers> processes,
+    until one of them finds an answer.
+
+    Each call returns its answer (None if it has none) and its counters.
+    Once an answer is found, the jobs not yet started are dropped, and
+    stop_requested() turns True in the workers: the running searches should
+    check it every so often and give up when it does.
+
+    Parameters:
+        search (Callable): the job function, run in the workers
+        jobs (list[tuple]): the arguments of each job
+        workers (int): number of processes
+        stats (SearchStats): optional, gets the counters of the jobs that ran
+        initializer, initargs: optional, run in each worker first, as for
+            ProcessPoolExecutor
+
+    Returns:
+        (tuple[int, object] | None): The index in <jobs> of the job that
+            found an answer, and the answer (None if no job found one).
+    """
+    stop_event = multiprocessing.Event()
+    found = None
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(stop_event, initializer, initargs)) as pool:
+        pending = {pool.submit(search, *job): index for index, job in enumerate(jobs)}
+        while pending and found is None:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                answer, job_stats = future.result()
+                if stats is not None:
+                    stats.merge(job_stats)
+                if answer is not None and found is None:
+                    found = index, answer
+
+        # tell the running jobs to give up and drop the ones not yet started
+        stop_event.set()
+        for future in pending:
+            future.cancel()
+    return found
+
+
+def stop_requested() -> bool:
+    """In a worker of first_answer_in_pool, whether another job has already
+    found an answer (always False elsewhere)."""
+    return _worker_stop is not None and _worker_stop.is_set()
+
+
+# set in each worker process of first_answer_in_pool's pool
+_worker_stop = None
+
+def _init_worker(stop_event, initializer: Callable[..., None] | None, initargs: tuple) -> None:
+    global _worker_stop
+    _worker_stop = stop_event
+    if initializer is not None:
+        initializer(*initargs)
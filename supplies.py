@@ -1,168 +1,1142 @@
-"""
-Module: supplies
-
-An application to solve the Disaster Planning problem.
-
-Authors:
-1. Parter A's Name
-2. Melissa Vargas Medina
-"""
-from sys import argv, exit
-import re
-
-class InvalidFileFormatError(Exception):
-    pass
-
-def parse_network_data(filename: str) -> tuple[dict[str, set[str]], dict[str, tuple[int,int]]]:
-    """
-    Reads city connection data <filename>, returning a dictionary that
-    associates each city with the set of cities that are directly connected to
-    it.
-
-    DO NOT MODIFY THIS FUNCTION IN ANY WAY!!!!!
-
-    Parameters:
-        filename (str): Name of the file containing city connections.
-
-    Returns:
-        (tuple[dict[str, set[str]], dict[str, tuple[int,int]]]): Two dictionaries:
-            (1) The cities and the set of cities they are directly connected
-            (2) The "logical" location of these cities.
-    """
-    network = {}
-    location = {}
-
-    with open(filename, 'r') as f:
-        for line in f:
-            clean_line = line.strip()
-
-            # skip over comment lines (start with a '#') and blank lines
-            if len(clean_line) == 0 or clean_line[0] == '#':
-                continue
-
-            # use a regular expression to parse this line, pulling out the
-            # city as well as comma separated list of neighbors.
-            match = re.fullmatch("(?P<city>[\w\-\. ]+)\s+\((?P<x>\d+),\s*(?P<y>\d+)\):(\s+(?P<neighbors>[\w\-\. ]+(,\s+[\w\-\. ]+)*))?", clean_line)
-            if not match:
-                raise InvalidFileFormatError(f"Invalid line: {clean_line}")
-
-            #print("Match:", clean_line)
-            city = match.group('city')
-            x_loc = int(match.group('x'))
-            y_loc = int(match.group('y'))
-            location[city] = (x_loc, y_loc)
-
-            neighbors = match.group('neighbors')
-            if neighbors is None:
-                continue
-
-            listed_neighbors = {n.strip() for n in neighbors.split(',')}
-
-            # add a link from this city to all the listed neighbors
-            network[city] = network.get(city, set()) | listed_neighbors
-
-            # add a link back from each listed neighbor to this city
-            for n in listed_neighbors:
-                n_neighbors = network.get(n, set())
-                n_neighbors.add(city)
-                network[n] = n_neighbors
-
-
-    return network, location
-
-
-def is_covered(road_network, supply_locations, city):
-    """ 
-    Test whether the city is covered or not
-
-    Parameters:
-    road_network (dict[str, set[str]]): A dictionary representing the road network where each key is a city and its value is a set of cities directly connected to it.
-    supply_locations (set[str]): A set of cities that are designated as supply locations.
-    city (str): The city to check for coverage.
-    
-    Returns:
-    bool: True if the city is covered, False otherwise.
- 
-    """
-    # Create a set containing the input city and all cities directly connected to it in the road network
-    return len(({city}|(road_network[city])) & (supply_locations)) > 0 
-
-def uncovered_cities(road_network, supply_locations):
-    """
-    finds the list of cities that havent been covered yet
-
-    Parameters:
-    road_network (dict[str, set[str]]): A dictionary representing the road network where each key is a city and its value is a set of cities directly connected to it.
-    supply_locations (set[str]): A set of cities that are designated as supply locations.
-    
-    Returns:
-    list: A list of uncovered cities.
-
-    """
-    # Initialize to store uncovered cities.
-    uc = []
-    # Iterate over all cities in the road network.
-    for c in road_network.keys():
-        if not is_covered(road_network, supply_locations, c):
-             # If not covered, append the city to the list of uncovered cities.
-            uc.append(c)
-    # Return the list of uncovered cities.
-    return uc
-
-def can_be_disaster_ready(road_network: dict[str, set[str]], num_cities: int, supply_locations: set[str]) -> bool:
-    """
-    This fuction determines if every city in a road network should be considered disater ready: which is determined by if they have the
-    proper resources and access to supply locations. 
-
-     Parameters:
-     road_network (dict[str, set[str]]): A dictionary representing the road network where each key is a city and its value is a set of cities directly connected to it.
-     num_cities (int): The total number of cities in the road network.
-     supply_locations (set[str]): A set of cities that are designated as supply locations.
-
-    Returns:
-     bool: True if all cities are disaster ready, False otherwise.
-
-    """
-    #esnures the number of cities is a non-neg
-    assert num_cities >= 0 
-
-    #finds the loist of cities that are still in need of diaster supplies 
-    uc = uncovered_cities(road_network, supply_locations)
-
-    # If there are more supply locations than cities, the network can't be fully covered
-    if len(supply_locations) > num_cities:
-        return False
-     # If all cities are covered, return True
-    if len(uc) == 0:
-        return True 
-
-    # Choose an uncovered city
-    uncv_city = uc[0] 
-    possible = {uncv_city}.union(road_network[uncv_city])  #tutoring unioun example: The union of {1, 2, 3} and {2, 3, 4} is the set {1, 2, 3, 4} 
-
-    # Placing supplies in each possible location and recursively check.
-    for city in possible:
-        supply_locations.add(city)
-        if can_be_disaster_ready(road_network, num_cities, supply_locations):
-            return True 
-        else:
-            supply_locations.remove(city)
- # If no solution found, return False
-    return False
-
-if __name__ == "__main__":
-    if len(argv) != 3:
-        print("Error: wrong number of command line parameters")
-        exit(1)
-
-    n, _ = parse_network_data(argv[1])
-    max_num_cities = int(argv[2])
-
-    supply_cities: set[str] = set()
-
-    ok = can_be_disaster_ready(n, max_num_cities, supply_cities)
-    if ok:
-        print("Supply Locations:", supply_cities)
-        assert len(supply_cities) <= max_num_cities, f"Problem constraint has been voilated: too many cities ({len(supply_cities)}) selected!"
-    else:
-        print("No solution possible!")
\ No newline at end of file
+"""
+Module: supplies
+
+An application to solve the Disaster Planning problem.
+
+Authors:
+1. Parter A's Name
+2. Melissa Vargas Medina
+"""
+from argparse import ArgumentParser
+from array import array
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+from sys import byteorder, intern
+import hashlib
+import os
+import re
+import struct
+import time
+
+from search_stats import (FailureCache, JOBS_PER_WORKER, POLL_INTERVAL, SearchAborted, SearchStats,
+                          first_answer_in_pool, stop_requested)
+
+# how many failed search states can_be_disaster_ready remembers
+CACHE_SIZE = 100_000
+
+# the line format of parse_network_data, compiled once for read_network_data
+_LINE = re.compile(r"(?P<city>[\w\-\. ]+)\s+\((?P<x>\d+),\s*(?P<y>\d+)\):(\s+(?P<neighbors>[\w\-\. ]+(,\s+[\w\-\. ]+)*))?")
+
+# load_network keeps its cache of <name>.dst in <name>.dst + NETWORK_CACHE_SUFFIX
+NETWORK_CACHE_SUFFIX = "c"
+
+# the start of a network cache file: magic, format version, byte order and
+# int size of the road arrays, then the source's mtime (ns), size and sha256,
+# and the number of names, of network keys, and of bytes in the name table
+_CACHE_MAGIC = b"DSTC"
+_CACHE_VERSION = 2
+_CACHE_HEADER = struct.Struct("<4sHBBqq32sIII")
+
+class InvalidFileFormatError(Exception):
+    pass
+
+def parse_network_data(filename: str) -> tuple[dict[str, set[str]], dict[str, tuple[int,int]]]:
+    """
+    Reads city connection data <filename>, returning a dictionary that
+    associates each city with the set of cities that are directly connected to
+    it.
+
+    DO NOT MODIFY THIS FUNCTION IN ANY WAY!!!!!
+
+    Parameters:
+        filename (str): Name of the file containing city connections.
+
+    Returns:
+        (tuple[dict[str, set[str]], dict[str, tuple[int,int]]]): Two dictionaries:
+            (1) The cities and the set of cities they are directly connected
+            (2) The "logical" location of these cities.
+    """
+    network = {}
+    location = {}
+
+    with open(filename, 'r') as f:
+        for line in f:
+            clean_line = line.strip()
+
+            # skip over comment lines (start with a '#') and blank lines
+            if len(clean_line) == 0 or clean_line[0] == '#':
+                continue
+
+            # use a regular expression to parse this line, pulling out the
+            # city as well as comma separated list of neighbors.
+            match = re.fullmatch("(?P<city>[\w\-\. ]+)\s+\((?P<x>\d+),\s*(?P<y>\d+)\):(\s+(?P<neighbors>[\w\-\. ]+(,\s+[\w\-\. ]+)*))?", clean_line)
+            if not match:
+                raise InvalidFileFormatError(f"Invalid line: {clean_line}")
+
+            #print("Match:", clean_line)
+            city = match.group('city')
+            x_loc = int(match.group('x'))
+            y_loc = int(match.group('y'))
+            location[city] = (x_loc, y_loc)
+
+            neighbors = match.group('neighbors')
+            if neighbors is None:
+                continue
+
+            listed_neighbors = {n.strip() for n in neighbors.split(',')}
+
+            # add a link from this city to all the listed neighbors
+            network[city] = network.get(city, set()) | listed_neighbors
+
+            # add a link back from each listed neighbor to this city
+            for n in listed_neighbors:
+                n_neighbors = network.get(n, set())
+                n_neighbors.add(city)
+                network[n] = n_neighbors
+
+
+    return network, location
+
+
+@dataclass
+class CompiledNetwork:
+    """A road network with each city numbered 0, 1, 2, ... (in the order of
+    the road network's keys), and sets of cities stored as int bitmasks: bit
+    i is set if city i is in the set.
+
+    >>> net = compile_network({"A": {"B"}, "B": {"A", "C"}, "C": {"B"}})
+    >>> net.closed[0] == 0b011 and net.closed[1] == 0b111
+    True
+    >>> sorted(net.cities_of(net.covered_by(net.mask_of({"A"}))))
+    ['A', 'B']
+    """
+    names: list[str]        # names[i] is the name of city i
+    ids: dict[str, int]     # the inverse of names
+    closed: list[int]       # closed[i]: city i and its neighbors, i.e. who can supply it
+    covers: list[int]       # covers[i]: the cities a supply at city i covers
+    all_mask: int           # the cities that need to be covered
+
+    def mask_of(self, cities: Iterable[str]) -> int:
+        """The bitmask of <cities> (ignoring any that aren't in the network)."""
+        mask = 0
+        for city in cities:
+            if city in self.ids:
+                mask |= 1 << self.ids[city]
+        return mask
+
+    def cities_of(self, mask: int) -> set[str]:
+        """The names of the cities in <mask>."""
+        return {self.names[i] for i in _bits(mask)}
+
+    def covered_by(self, supply_mask: int) -> int:
+        """The bitmask of cities covered by supplies at the cities in <supply_mask>."""
+        covered = 0
+        for i in _bits(supply_mask):
+            covered |= self.covers[i]
+        return covered
+
+    def to_road_network(self) -> dict[str, set[str]]:
+        """Converts back to the dictionary form used by parse_network_data."""
+        return {self.names[i]: self.cities_of(self.closed[i] & ~(1 << i)) for i in _bits(self.all_mask)}
+
+
+def _bits(mask: int) -> Iterator[int]:
+    """Yields the positions of the set bits of <mask>, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def compile_network(road_network: dict[str, set[str]]) -> CompiledNetwork:
+    """
+    Converts a road network into its CompiledNetwork form.
+
+    Cities that only appear as someone's neighbor still get an id (so they
+    can hold supplies), but like in uncovered_cities, only the keys of
+    <road_network> need to be covered.
+
+    Parameters:
+        road_network (dict[str, set[str]]): each city and the set of cities
+            directly connected to it
+
+    Returns:
+        (CompiledNetwork): The same network, with integer ids and bitmasks.
+    """
+    names = list(road_network)
+    ids = {city: i for i, city in enumerate(names)}
+    for neighbors in road_network.values():
+        for n in neighbors:
+            if n not in ids:
+                ids[n] = len(names)
+                names.append(n)
+
+    closed = [1 << i for i in range(len(names))]
+    covers = [1 << i for i in range(len(names))]
+    symmetric = True
+    for city, neighbors in road_network.items():
+        i = ids[city]
+        for n in neighbors:
+            j = ids[n]
+            closed[i] |= 1 << j
+            covers[j] |= 1 << i
+            symmetric = symmetric and city in road_network.get(n, ())
+
+    all_mask = (1 << len(road_network)) - 1
+    return CompiledNetwork(names, ids, closed, closed if symmetric else covers, all_mask)
+
+
+def read_network_data(filename: str, compiled: bool = False) -> tuple[dict[str, set[str]] | CompiledNetwork,
+                                                                      dict[str, tuple[int,int]]]:
+    """
+    Reads the same format as parse_network_data, giving the same results and
+    raising the same InvalidFileFormatError, but faster on big files: the
+    line pattern is compiled once, city names are interned, and neighbor
+    sets are updated in place rather than copied for every line.
+
+    Parameters:
+        filename (str): Name of the file containing city connections.
+        compiled (bool): If True, build the CompiledNetwork directly instead
+            of the dictionary.
+
+    Returns:
+        (tuple[dict[str, set[str]] | CompiledNetwork, dict[str, tuple[int,int]]]):
+            The road network, in the form asked for, and the city locations.
+    """
+    network: dict[str, set[str]] = {}
+    location = {}
+    # for compiled: the id of each city (in the order network would have
+    # them as keys), and the ids of its neighbors
+    ids: dict[str, int] = {}
+    adjacent: list[list[int]] = []
+
+    fullmatch = _LINE.fullmatch
+    with open(filename, 'r') as f:
+        for line in f:
+            clean_line = line.strip()
+            if len(clean_line) == 0 or clean_line[0] == '#':
+                continue
+
+            match = fullmatch(clean_line)
+            if not match:
+                raise InvalidFileFormatError(f"Invalid line: {clean_line}")
+
+            city, x_loc, y_loc, neighbors = match.group('city', 'x', 'y', 'neighbors')
+            city = intern(city)
+            location[city] = (int(x_loc), int(y_loc))
+
+            if neighbors is None:
+                continue
+            listed_neighbors = set(map(intern, map(str.strip, neighbors.split(','))))
+
+            if compiled:
+                if city not in ids:
+                    ids[city] = len(adjacent)
+                    adjacent.append([])
+                i = ids[city]
+                for n in listed_neighbors:
+                    if n not in ids:
+                        ids[n] = len(adjacent)
+                        adjacent.append([])
+                    adjacent[i].append(ids[n])
+                    adjacent[ids[n]].append(i)
+                continue
+
+            city_neighbors = network.get(city)
+            if city_neighbors is None:
+                city_neighbors = network[city] = set()
+            for n in listed_neighbors:
+                city_neighbors.add(n)
+                n_neighbors = network.get(n)
+                if n_neighbors is None:
+                    network[n] = {city}
+                else:
+                    n_neighbors.add(city)
+
+    if not compiled:
+        return network, location
+    return _compile_two_way(list(ids), adjacent), location
+
+
+def _compile_two_way(names: list[str], adjacent: Iterable[Iterable[int]]) -> CompiledNetwork:
+    """Builds the CompiledNetwork of a network where every road goes both
+    ways (as in the files), given the neighbor ids of each city."""
+    # who a city covers is then just who can supply it
+    closed = []
+    for i, neighbors in enumerate(adjacent):
+        mask = 1 << i
+        for j in neighbors:
+            mask |= 1 << j
+        closed.append(mask)
+    return CompiledNetwork(names, {city: i for i, city in enumerate(names)}, closed, closed,
+                           (1 << len(names)) - 1)
+
+
+def load_network(filename: str, compiled: bool = False) -> tuple[dict[str, set[str]] | CompiledNetwork,
+                                                                 dict[str, tuple[int,int]]]:
+    """
+    Loads a road network file like read_network_data, but keeps a binary copy
+    of the result next to it (see write_network_cache), which later loads
+    read instead of parsing the file again, for as long as the file's mtime,
+    size and sha256 stay the same.
+
+    If the cache can't be written (say, the directory is read only, or a
+    coordinate is too big for it), the file is just parsed every time.
+
+    Parameters:
+        filename (str): Name of the file containing city connections.
+        compiled (bool): If True, return the CompiledNetwork form.
+
+    Returns:
+        (tuple[dict[str, set[str]] | CompiledNetwork, dict[str, tuple[int,int]]]):
+            The road network, in the form asked for, and the city locations.
+    """
+    cache_file = filename + NETWORK_CACHE_SUFFIX
+    cached = read_network_cache(cache_file, filename, compiled)
+    if cached is not None:
+        return cached
+
+    network, location = read_network_data(filename)
+    try:
+        write_network_cache(network, location, cache_file, filename)
+    except (OSError, OverflowError):
+        pass
+    if compiled:
+        return compile_network(network), location
+    return network, location
+
+
+def _source_signature(filename: str) -> tuple[int, int, bytes]:
+    """The mtime (in ns), size and sha256 digest of <filename>."""
+    info = os.stat(filename)
+    with open(filename, 'rb') as f:
+        digest = hashlib.sha256(f.read()).digest()
+    return info.st_mtime_ns, info.st_size, digest
+
+
+def write_network_cache(network: dict[str, set[str]], location: dict[str, tuple[int,int]],
+                        cache_file: str, source: str) -> None:
+    """
+    Writes <network> and <location>, as read from <source>, to <cache_file>.
+
+    The cities are numbered with the network's keys first (in order), then
+    the cities that only have a location. After a header, the file holds:
+    the names, one per line; the CSR form of the roads (for each key, the
+    offset of its first neighbor in the targets array, plus a final end
+    offset; then the targets); and x, y for each city as 64-bit ints (-1, -1
+    if it has no location).
+
+    Parameters:
+        network (dict[str, set[str]]): the road network
+        location (dict[str, tuple[int,int]]): the city locations
+        cache_file (str): the file to write (replaced in one step, so a
+            reader never sees half of it)
+        source (str): the .dst file they were read from
+
+    Raises:
+        OverflowError: if a coordinate doesn't fit in 64 bits (nothing is
+            written then)
+    """
+    names = list(network)
+    names.extend(city for city in location if city not in network)
+    ids = {city: i for i, city in enumerate(names)}
+
+    offsets = array('i', [0])
+    targets = array('i')
+    for neighbors in network.values():
+        targets.extend(ids[n] for n in neighbors)
+        offsets.append(len(targets))
+    locations = array('q')
+    for city in names:
+        locations.extend(location.get(city, (-1, -1)))
+
+    name_table = "\n".join(names).encode()
+    mtime_ns, size, digest = _source_signature(source)
+    header = _CACHE_HEADER.pack(_CACHE_MAGIC, _CACHE_VERSION, byteorder == "little", offsets.itemsize,
+                                mtime_ns, size, digest, len(names), len(network), len(name_table))
+
+    partial = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        with open(partial, 'wb') as f:
+            f.write(header)
+            f.write(name_table)
+            offsets.tofile(f)
+            targets.tofile(f)
+            locations.tofile(f)
+        os.replace(partial, cache_file)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+
+
+def read_network_cache(cache_file: str, source: str, compiled: bool = False
+                       ) -> tuple[dict[str, set[str]] | CompiledNetwork, dict[str, tuple[int,int]]] | None:
+    """
+    Reads a file written by write_network_cache, with bulk array reads.
+
+    Parameters:
+        cache_file (str): the cache file
+        source (str): the .dst file it should be a copy of
+        compiled (bool): If True, return the CompiledNetwork form.
+
+    Returns:
+        (tuple[dict[str, set[str]] | CompiledNetwork, dict[str, tuple[int,int]]] | None):
+            The road network and the city locations, or None if the cache is
+            missing, unreadable, damaged, from another kind of machine, or
+            out of date (<source>'s mtime, size or sha256 has changed).
+    """
+    try:
+        with open(cache_file, 'rb') as f:
+            header = f.read(_CACHE_HEADER.size)
+            if len(header) < _CACHE_HEADER.size:
+                return None
+            (magic, version, little, itemsize, mtime_ns, size, digest,
+             num_names, num_keys, table_size) = _CACHE_HEADER.unpack(header)
+            if (magic != _CACHE_MAGIC or version != _CACHE_VERSION or little != (byteorder == "little")
+                    or itemsize != array('i').itemsize):
+                return None
+            if (mtime_ns, size, digest) != _source_signature(source):
+                return None
+
+            names = list(map(intern, f.read(table_size).decode().split("\n"))) if num_names else []
+            if len(names) != num_names or len(set(names)) != num_names or num_keys > num_names:
+                return None
+            offsets = array('i')
+            offsets.fromfile(f, num_keys + 1)
+            # the offsets must run from 0 up to the end of the targets, and
+            # the targets must be ids of cities
+            if offsets[0] != 0 or any(start > end for start, end in zip(offsets, offsets[1:])):
+                return None
+            targets = array('i')
+            targets.fromfile(f, offsets[-1])
+            if targets and (min(targets) < 0 or max(targets) >= num_names):
+                return None
+            locations = array('q')
+            locations.fromfile(f, 2 * num_names)
+    except (OSError, EOFError, UnicodeDecodeError, struct.error):
+        return None
+
+    location = dict(zip(names, zip(locations[0::2], locations[1::2])))
+    for city in names[:num_keys]:
+        if location[city][0] < 0:
+            del location[city]
+    roads = (targets[start:end] for start, end in zip(offsets, offsets[1:]))
+    if compiled:
+        return _compile_two_way(names[:num_keys], roads), location
+    name_of = names.__getitem__
+    return dict(zip(names, (set(map(name_of, neighbors)) for neighbors in roads))), location
+
+
+def is_covered(road_network, supply_locations, city):
+    """ 
+    Test whether the city is covered or not
+
+    Parameters:
+    road_network (dict[str, set[str]]): A dictionary representing the road network where each key is a city and its value is a set of cities directly connected to it.
+    supply_locations (set[str]): A set of cities that are designated as supply locations.
+    city (str): The city to check for coverage.
+    
+    Returns:
+    bool: True if the city is covered, False otherwise.
+ 
+    """
+    # Create a set containing the input city and all cities directly connected to it in the road network
+    return len(({city}|(road_network[city])) & (supply_locations)) > 0 
+
+def uncovered_cities(road_network, supply_locations):
+    """
+    finds the list of cities that havent been covered yet
+
+    Parameters:
+    road_network (dict[str, set[str]] | CompiledNetwork): A dictionary representing the road network where each key is a city and its value is a set of cities directly connected to it (or its compiled form).
+    supply_locations (set[str]): A set of cities that are designated as supply locations.
+    
+    Returns:
+    list: A list of uncovered cities.
+
+    """
+    if isinstance(road_network, CompiledNetwork):
+        # with bitmasks, coverage is just a few ORs
+        uncovered = road_network.all_mask & ~road_network.covered_by(road_network.mask_of(supply_locations))
+        return [road_network.names[i] for i in _bits(uncovered)]
+
+    # Initialize to store uncovered cities.
+    uc = []
+    # Iterate over all cities in the road network.
+    for c in road_network.keys():
+        if not is_covered(road_network, supply_locations, c):
+             # If not covered, append the city to the list of uncovered cities.
+            uc.append(c)
+    # Return the list of uncovered cities.
+    return uc
+
+def can_be_disaster_ready(road_network: dict[str, set[str]] | CompiledNetwork, num_cities: int,
+                          supply_locations: set[str], stats: SearchStats | None = None) -> bool:
+    """
+    This fuction determines if every city in a road network should be considered disater ready: which is determined by if they have the
+    proper resources and access to supply locations. 
+
+    The search itself runs on the CompiledNetwork form of the network (the
+    dictionary form is converted first), and the supply cities it picks are
+    added to supply_locations by name.
+
+     Parameters:
+     road_network (dict[str, set[str]] | CompiledNetwork): A dictionary representing the road network where each key is a city and its value is a set of cities directly connected to it (or its compiled form).
+     num_cities (int): The total number of cities in the road network.
+     supply_locations (set[str]): A set of cities that are designated as supply locations.
+     stats (SearchStats): Optional, filled in with how much work the search did.
+
+    Returns:
+     bool: True if all cities are disaster ready, False otherwise.
+
+    """
+    #esnures the number of cities is a non-neg
+    assert num_cities >= 0 
+
+    # If there are already more supply locations than allowed, don't bother
+    # looking at the network at all
+    if len(supply_locations) > num_cities:
+        if stats is not None:
+            stats.pruned += 1
+        return False
+
+    if not isinstance(road_network, CompiledNetwork):
+        road_network = compile_network(road_network)
+
+    search = _CoverSearch(road_network, num_cities, FailureCache(CACHE_SIZE))
+    for city in _bits(road_network.mask_of(supply_locations)):
+        search.add(city)
+    try:
+        found = search.search(len(supply_locations))
+    finally:
+        if stats is not None:
+            search.report(stats)
+    if not found:
+        return False
+    supply_locations.update(road_network.cities_of(search.supply))
+    return True
+
+
+class _CoverSearch:
+    """
+    The search behind can_be_disaster_ready.
+
+    Rather than working out which cities are uncovered from scratch at every
+    step, it keeps a count of the supplies covering each city and a live
+    bitmask of the uncovered cities. Adding or removing a supply city only
+    updates the counts of the cities it covers.
+
+    Parameters:
+        net (CompiledNetwork): the road network
+        num_cities (int): the most supply cities allowed
+        memo (FailureCache): Optional cache of failed states. The same
+            cities can end up covered by adding supply cities in different
+            orders, and what is left to do only depends on which cities are
+            uncovered and how many more supply cities are allowed, so that
+            pair is the state.
+        stop (Callable[[], bool]): Optional; checked every POLL_INTERVAL
+            nodes, and SearchAborted is raised once it returns True.
+    """
+
+    def __init__(self, net: CompiledNetwork, num_cities: int, memo: FailureCache | None = None,
+                 stop: Callable[[], bool] | None = None) -> None:
+        self.net = net
+        self.num_cities = num_cities
+        self.memo = memo
+        self.stop = stop
+        self.next_check = POLL_INTERVAL
+        # reach[i] lists the cities a supply at city i covers
+        self.reach = [list(_bits(mask)) for mask in net.covers]
+        # num_suppliers[i] is how many cities could supply city i
+        self.num_suppliers = [mask.bit_count() for mask in net.closed]
+        # the most cities a single supply city can cover
+        self.max_reach = max((mask.bit_count() for mask in net.covers), default=0)
+        self.cover_count = [0] * len(net.names)
+        self.uncovered = net.all_mask
+        self.supply = 0
+        self.nodes = 0
+        self.backtracks = 0
+        self.max_depth = 0
+        self.pruned = 0
+        # when minimizing, the smallest supply set found so far
+        self.minimizing = False
+        self.best: int | None = None
+
+    def add(self, city: int) -> None:
+        """Makes <city> a supply city."""
+        self.supply |= 1 << city
+        count = self.cover_count
+        for c in self.reach[city]:
+            if count[c] == 0:
+                self.uncovered &= ~(1 << c)
+            count[c] += 1
+
+    def remove(self, city: int) -> None:
+        """Undoes add(<city>)."""
+        self.supply &= ~(1 << city)
+        count = self.cover_count
+        for c in self.reach[city]:
+            count[c] -= 1
+            if count[c] == 0:
+                self.uncovered |= (1 << c) & self.net.all_mask
+
+    def search(self, num_supplies: int) -> bool:
+        """Tries to cover the rest of the cities with at most num_cities
+        supply cities in total, given that there are <num_supplies> now."""
+        self.nodes += 1
+        if self.stop is not None and self.nodes >= self.next_check:
+            self.next_check += POLL_INTERVAL
+            if self.stop():
+                raise SearchAborted
+        if num_supplies > self.max_depth:
+            self.max_depth = num_supplies
+
+        # If there are more supply locations than allowed, this can't work
+        if num_supplies > self.num_cities:
+            self.pruned += 1
+            return False
+        # If all cities are covered, we're done
+        uncovered = self.uncovered
+        if uncovered == 0:
+            if not self.minimizing:
+                return True
+            # keep going, but only for something smaller than this
+            self.best = self.supply
+            self.num_cities = num_supplies - 1
+            return False
+        memo = self.memo
+        if memo is not None and (uncovered, self.num_cities - num_supplies) in memo:
+            return False
+        if not self._budget_can_cover(uncovered, self.num_cities - num_supplies):
+            self.pruned += 1
+            return False
+
+        for candidate in self._candidates(uncovered):
+            self.add(candidate)
+            if self.search(num_supplies + 1):
+                return True
+            self.remove(candidate)
+            self.backtracks += 1
+        # If no solution found, return False. When minimizing, num_cities may
+        # have dropped since this call started, and only the smaller budget
+        # is known to fail.
+        if memo is not None:
+            memo.add((uncovered, self.num_cities - num_supplies))
+        return False
+
+    def minimize(self, num_supplies: int) -> int | None:
+        """
+        Finds the smallest supply set (of at most num_cities cities) that
+        keeps the current supply cities, of which there are <num_supplies>.
+
+        A greedy cover gives the first bound, and the bound is tightened every
+        time a smaller cover is found, so a single search does it all.
+
+        Returns:
+            (int | None): The bitmask of the supply cities, or None if more
+                than num_cities are needed.
+        """
+        greedy = self._greedy()
+        if greedy.bit_count() <= self.num_cities:
+            self.best = greedy
+            self.num_cities = greedy.bit_count() - 1
+        self.minimizing = True
+        try:
+            self.search(num_supplies)
+        finally:
+            self.minimizing = False
+        return self.best
+
+    def _greedy(self) -> int:
+        """A supply set that keeps the current one, adding whichever city
+        newly covers the most until everything is covered."""
+        covers = self.net.covers
+        uncovered = self.uncovered
+        supply = self.supply
+        while uncovered:
+            pick = max(range(len(covers)), key=lambda c: (covers[c] & uncovered).bit_count())
+            supply |= 1 << pick
+            uncovered &= ~covers[pick]
+        return supply
+
+    def _budget_can_cover(self, uncovered: int, budget: int) -> bool:
+        """
+        Lower bounds on the supply cities still needed, compared with the
+        <budget> that is left.
+
+        Each supply city covers at most max_reach cities. Also, uncovered
+        cities whose closed neighborhoods don't overlap can't share a supply
+        city, so a set of them (picked greedily) needs one supply each.
+        """
+        if budget * self.max_reach < uncovered.bit_count():
+            return False
+
+        closed = self.net.closed
+        blocked = 0
+        needed = 0
+        for city in _bits(uncovered):
+            if closed[city] & blocked == 0:
+                blocked |= closed[city]
+                needed += 1
+                if needed > budget:
+                    return False
+        return True
+
+    def _candidates(self, uncovered: int) -> list[int]:
+        """
+        Picks the uncovered city with the fewest cities that could supply it
+        (so the search branches as little as possible), and returns the
+        supply cities worth trying for it, most newly covered cities first.
+
+        A candidate is skipped if another one would newly cover every city it
+        would: swapping it for the other can never leave a city uncovered.
+        """
+        closed = self.net.closed
+        city = min(_bits(uncovered), key=self.num_suppliers.__getitem__)
+
+        gains = [(candidate, self.net.covers[candidate] & uncovered) for candidate in _bits(closed[city])]
+        gains.sort(key=lambda cg: cg[1].bit_count(), reverse=True)
+
+        kept: list[int] = []
+        kept_gains: list[int] = []
+        for candidate, gain in gains:
+            # anything that could contain this gain is at least as big, so it
+            # was sorted before it
+            if any(gain & other == gain for other in kept_gains):
+                self.pruned += 1
+                continue
+            kept.append(candidate)
+            kept_gains.append(gain)
+        return kept
+
+    def report(self, stats: SearchStats) -> None:
+        """Adds this search's counters to <stats>."""
+        stats.nodes += self.nodes
+        stats.backtracks += self.backtracks
+        stats.max_depth = max(stats.max_depth, self.max_depth)
+        stats.pruned += self.pruned
+        if self.memo is not None:
+            stats.cache_hits += self.memo.hits
+            stats.cache_misses += self.memo.misses
+
+
+@dataclass
+class ReducedNetwork:
+    """What reduce_network leaves for the search: the supply cities that can
+    be chosen up front, and the connected pieces of the network that still
+    have to be solved (each one on its own)."""
+    forced: set[str]                        # supply cities some best answer always has
+    components: list[dict[str, set[str]]]   # the connected components, as road networks
+
+
+def reduce_network(road_network: dict[str, set[str]], location: dict[str, tuple[int, int]] | None = None,
+                   supply_locations: Iterable[str] = ()) -> ReducedNetwork:
+    """
+    Simplifies a road network before searching it.
+
+    - A city with no neighbors can only be covered by a supply of its own.
+      parse_network_data leaves such cities out of the network, so any city
+      in <location> that isn't in <road_network> is added as one.
+    - A leaf city (one neighbor) can be covered by itself or its neighbor.
+      If the neighbor covers everything the leaf would, the neighbor is
+      always at least as good, so it is made a supply city.
+    - The rest is split into connected components, which share no cities
+      and so can be solved separately.
+
+    Parameters:
+        road_network (dict[str, set[str]]): each city and the set of cities
+            directly connected to it
+        location (dict[str, tuple[int,int]]): optional, the city locations
+            from parse_network_data
+        supply_locations (Iterable[str]): cities that are already supply
+            locations (leaves they cover need nothing forced)
+
+    Returns:
+        (ReducedNetwork): The forced supply cities (not including
+            <supply_locations>) and the components.
+    """
+    network = dict(road_network)
+    for city in location or ():
+        if city not in network:
+            network[city] = set()
+    net = compile_network(network)
+
+    chosen = net.mask_of(supply_locations)
+    forced = 0
+    for city in _bits(net.all_mask):
+        suppliers = net.closed[city]
+        if suppliers & (chosen | forced):
+            continue
+        if suppliers == 1 << city:
+            forced |= 1 << city
+        elif suppliers.bit_count() == 2:
+            neighbor = (suppliers & ~(1 << city)).bit_length() - 1
+            if net.covers[city] & ~net.covers[neighbor] == 0:
+                forced |= 1 << neighbor
+
+    # roads may be listed in one direction only, so follow them both ways
+    linked = [closed | covers for closed, covers in zip(net.closed, net.covers)]
+    components = []
+    unseen = net.all_mask
+    while unseen:
+        component = frontier = unseen & -unseen
+        while frontier:
+            reached = 0
+            for city in _bits(frontier):
+                reached |= linked[city]
+            frontier = reached & ~component
+            component |= frontier
+        unseen &= ~component
+        components.append({net.names[i]: network[net.names[i]] for i in _bits(component & net.all_mask)})
+
+    return ReducedNetwork(net.cities_of(forced), components)
+
+
+def _component_minimum(road_network: dict[str, set[str]], supply_locations: set[str],
+                       most: int) -> tuple[set[str] | None, SearchStats]:
+    """
+    Finds the fewest supply cities to add to <supply_locations> so that every
+    city of <road_network> is covered, if <most> or fewer will do.
+
+    Returns:
+        (tuple[set[str] | None, SearchStats]): The added cities (None if more
+            than <most> are needed), and the work the searches did.
+    """
+    net = compile_network(road_network)
+    have = net.mask_of(supply_locations)
+    search = _CoverSearch(net, have.bit_count() + most, FailureCache(CACHE_SIZE))
+    for city in _bits(have):
+        search.add(city)
+    best = search.minimize(have.bit_count())
+
+    stats = SearchStats()
+    search.report(stats)
+    if best is None:
+        return None, stats
+    return net.cities_of(best & ~have), stats
+
+
+def _component_cover(road_network: dict[str, set[str]], supply_locations: set[str],
+                     most: int) -> tuple[set[str] | None, SearchStats]:
+    """
+    Like _component_minimum, but any <most> or fewer supply cities will do,
+    so the search stops at the first cover it finds. With a generous <most>
+    that is far quicker than proving which cover is the smallest.
+    """
+    net = compile_network(road_network)
+    have = net.mask_of(supply_locations)
+    search = _CoverSearch(net, have.bit_count() + most, FailureCache(CACHE_SIZE))
+    for city in _bits(have):
+        search.add(city)
+    found = search.search(have.bit_count())
+
+    stats = SearchStats()
+    search.report(stats)
+    if not found:
+        return None, stats
+    return net.cities_of(search.supply & ~have), stats
+
+
+def minimum_supply_cities(road_network: dict[str, set[str]], location: dict[str, tuple[int, int]] | None = None,
+                          stats: SearchStats | None = None, *, workers: int = 1) -> set[str]:
+    """
+    Finds a smallest set of supply cities that covers every city.
+
+    The network is reduced and split into components like in
+    can_be_disaster_ready_by_components, and each component gets one
+    branch-and-bound search (see _CoverSearch.minimize), rather than
+    solving with budgets 0, 1, 2, ... in turn.
+
+    Parameters:
+        road_network (dict[str, set[str]]): each city and the set of cities
+            directly connected to it
+        location (dict[str, tuple[int,int]]): optional, the city locations
+            from parse_network_data (cities with no roads then count too)
+        stats (SearchStats): Optional, filled in with how much work the
+            searches did.
+        workers (int): how many processes to solve the components in
+
+    Returns:
+        (set[str]): The supply cities.
+
+    >>> sorted(minimum_supply_cities({"A": {"B"}, "B": {"A", "C"}, "C": {"B"}}, {"D": (0, 0)}))
+    ['B', 'D']
+    """
+    reduced = reduce_network(road_network, location)
+    forced = reduced.forced
+    sizes = [len(component) for component in reduced.components]
+    if workers > 1 and len(reduced.components) > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_component_minimum, reduced.components, repeat(forced), sizes))
+    else:
+        results = map(_component_minimum, reduced.components, repeat(forced), sizes)
+
+    supply = set(forced)
+    for extra, component_stats in results:
+        supply |= extra
+        if stats is not None:
+            stats.merge(component_stats)
+    return supply
+
+
+def can_be_disaster_ready_by_components(road_network: dict[str, set[str]], num_cities: int,
+                                        supply_locations: set[str],
+                                        location: dict[str, tuple[int, int]] | None = None, *,
+                                        workers: int = 1, stats: SearchStats | None = None) -> bool:
+    """
+    Like can_be_disaster_ready, but runs reduce_network first and solves each
+    connected component on its own. Every component but the largest needs
+    its fewest supply cities found, as that decides how much of the budget
+    is left; the largest then only has to be covered with what remains.
+
+    Unlike can_be_disaster_ready, cities that are only in <location> (the
+    ones with no roads) are counted, and each needs its own supply city.
+
+    Parameters:
+        road_network (dict[str, set[str]]): each city and the set of cities
+            directly connected to it
+        num_cities (int): the most supply cities allowed
+        supply_locations (set[str]): cities that are already supply
+            locations; the supply cities picked are added to it
+        location (dict[str, tuple[int,int]]): optional, the city locations
+            from parse_network_data
+        workers (int): how many processes to solve the smaller components
+            in (1 solves them one after another, in this process)
+        stats (SearchStats): Optional, filled in with how much work the
+            searches did.
+
+    Returns:
+        bool: True if all cities can be covered, False otherwise.
+    """
+    assert num_cities >= 0
+    if len(supply_locations) > num_cities:
+        if stats is not None:
+            stats.pruned += 1
+        return False
+
+    started = time.perf_counter()
+    reduced = reduce_network(road_network, location, supply_locations)
+    chosen = supply_locations | reduced.forced
+    if stats is not None:
+        stats.add_time("reduce", time.perf_counter() - started)
+    budget = num_cities - len(chosen)
+    if budget < 0:
+        if stats is not None:
+            stats.pruned += 1
+        return False
+
+    added: set[str] = set()
+    if reduced.components:
+        largest = max(reduced.components, key=len)
+        others = [component for component in reduced.components if component is not largest]
+        if workers > 1 and len(others) > 1:
+            # each component gets the whole budget; the sum is checked below
+            with ProcessPoolExecutor(workers) as pool:
+                results = list(pool.map(_component_minimum, others, repeat(chosen), repeat(budget)))
+        else:
+            # each component only gets what the ones before it left over
+            results = []
+            left = budget
+            for component in others:
+                results.append(_component_minimum(component, chosen, left))
+                if results[-1][0] is None:
+                    break
+                left -= len(results[-1][0])
+
+        for extra, component_stats in results:
+            if stats is not None:
+                stats.merge(component_stats)
+            if extra is None:
+                return False
+            added |= extra
+        if len(added) > budget:
+            return False
+
+        extra, component_stats = _component_cover(largest, chosen, budget - len(added))
+        if stats is not None:
+            stats.merge(component_stats)
+        if extra is None:
+            return False
+        added |= extra
+
+    supply_locations.update(chosen, added)
+    return True
+
+def can_be_disaster_ready_parallel(road_network: dict[str, set[str]], num_cities: int,
+                                   supply_locations: set[str],
+                                   location: dict[str, tuple[int, int]] | None = None, *,
+                                   workers: int | None = None, stats: SearchStats | None = None) -> bool:
+    """
+    Same as can_be_disaster_ready_by_components, but spread over a pool of
+    processes. The fewest supply cities for every component but the largest
+    are found side by side. Then the supply cities worth trying for the
+    first few uncovered cities of the largest component are expanded, and
+    each of those branches is searched as a separate job. As soon as one job
+    finds enough supply cities, the others are stopped.
+
+    Parameters:
+        road_network, num_cities, supply_locations, location: as for
+            can_be_disaster_ready_by_components
+        workers (int): number of processes (defaults to the number of CPUs)
+        stats (SearchStats): optional, gets the counters summed over all jobs
+
+    Returns:
+        bool: True if all cities can be covered, False otherwise.
+    """
+    assert num_cities >= 0
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if len(supply_locations) > num_cities:
+        if stats is not None:
+            stats.pruned += 1
+        return False
+
+    started = time.perf_counter()
+    reduced = reduce_network(road_network, location, supply_locations)
+    chosen = supply_locations | reduced.forced
+    if stats is not None:
+        stats.add_time("reduce", time.perf_counter() - started)
+    budget = num_cities - len(chosen)
+    if budget < 0:
+        if stats is not None:
+            stats.pruned += 1
+        return False
+
+    added: set[str] = set()
+    if reduced.components:
+        largest = max(reduced.components, key=len)
+        others = [component for component in reduced.components if component is not largest]
+        if others:
+            with ProcessPoolExecutor(workers) as pool:
+                results = list(pool.map(_component_minimum, others, repeat(chosen), repeat(budget)))
+            for extra, component_stats in results:
+                if stats is not None:
+                    stats.merge(component_stats)
+                if extra is None:
+                    return False
+                added |= extra
+        if len(added) > budget:
+            return False
+
+        extra = _cover_in_pool(compile_network(largest), chosen, budget - len(added), workers, stats)
+        if extra is None:
+            return False
+        added |= extra
+
+    supply_locations.update(chosen, added)
+    return True
+
+
+def _split_cover(net: CompiledNetwork, have: int, num_cities: int, min_jobs: int) -> list[int]:
+    """
+    Expands the top of the search tree one supply city at a time, the same
+    way _CoverSearch.search would, until there are at least <min_jobs>
+    branches (or none are left), starting from the supply cities in <have>.
+
+    Returns:
+        (list[int]): The supply cities (bitmasks) of each branch, in the
+            order the serial search would visit them.
+    """
+    top = _CoverSearch(net, num_cities)
+    jobs = [have]
+    while jobs and len(jobs) < min_jobs:
+        expanded = []
+        for supply in jobs:
+            uncovered = net.all_mask & ~net.covered_by(supply)
+            if uncovered == 0:
+                # already a full answer, so there is nothing to split
+                return [supply]
+            if top._budget_can_cover(uncovered, num_cities - supply.bit_count()):
+                expanded.extend(supply | 1 << candidate for candidate in top._candidates(uncovered))
+        jobs = expanded
+    return jobs
+
+
+def _cover_in_pool(net: CompiledNetwork, supply_locations: set[str], most: int, workers: int,
+                   stats: SearchStats | None) -> set[str] | None:
+    """Covers <net> with at most <most> supply cities besides
+    <supply_locations>, searching the branches from _split_cover in a process
+    pool. Returns the added supply cities of the first answer found (or
+    None)."""
+    have = net.mask_of(supply_locations)
+    num_cities = have.bit_count() + most
+    jobs = _split_cover(net, have, num_cities, JOBS_PER_WORKER * workers)
+    found = first_answer_in_pool(_search_branch, [(supply, num_cities) for supply in jobs], workers, stats,
+                                 initializer=_init_worker, initargs=(net,))
+    if found is None:
+        return None
+    return net.cities_of(found[1] & ~have)
+
+
+# set in each worker process of _cover_in_pool's pool
+_worker_net = None
+
+def _init_worker(net: CompiledNetwork) -> None:
+    global _worker_net
+    _worker_net = net
+
+
+def _search_branch(supply: int, num_cities: int) -> tuple[int | None, SearchStats]:
+    """Runs one job of _cover_in_pool in a worker process.
+
+    Returns:
+        (tuple[int | None, SearchStats]): The supply cities (a bitmask) of
+            an answer (None if there is none or the job was stopped), and the
+            job's counters.
+    """
+    search = _CoverSearch(_worker_net, num_cities, FailureCache(CACHE_SIZE), stop=stop_requested)
+    for city in _bits(supply):
+        search.add(city)
+    started = time.perf_counter()
+    try:
+        found = search.search(supply.bit_count())
+    except SearchAborted:
+        found = False
+    stats = SearchStats()
+    search.report(stats)
+    stats.add_time("search", time.perf_counter() - started)
+    return (search.supply if found else None), stats
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Solves the Disaster Planning problem.")
+    parser.add_argument("filename", help="file with the road network")
+    parser.add_argument("max_num_cities", type=int, nargs="?",
+                        help="most supply cities allowed (if left out, the fewest possible are found)")
+    parser.add_argument("--stats", action="store_true", help="print statistics about the search")
+    parser.add_argument("--workers", type=int, default=1, help="number of processes to search with")
+    args = parser.parse_args()
+
+    stats = SearchStats() if args.stats else None
+    started = time.perf_counter()
+    n, location = load_network(args.filename)
+    if stats is not None:
+        stats.add_time("parse", time.perf_counter() - started)
+    max_num_cities = args.max_num_cities
+
+    supply_cities: set[str] = set()
+
+    started = time.perf_counter()
+    if max_num_cities is None:
+        supply_cities = minimum_supply_cities(n, location, stats, workers=args.workers)
+        max_num_cities = len(supply_cities)
+        ok = True
+    elif args.workers > 1:
+        ok = can_be_disaster_ready_parallel(n, max_num_cities, supply_cities, location,
+                                            workers=args.workers, stats=stats)
+    else:
+        ok = can_be_disaster_ready_by_components(n, max_num_cities, supply_cities, location, stats=stats)
+    if stats is not None:
+        stats.add_time("search", time.perf_counter() - started)
+    if ok:
+        print("Supply Locations:", supply_cities)
+        assert len(supply_cities) <= max_num_cities, f"Problem constraint has been voilated: too many cities ({len(supply_cities)}) selected!"
+    else:
+        print("No solution possible!")
+
+    if stats is not None:
+        print("Search statistics:")
+        for line in str(stats).splitlines():
+            print(f"\t{line}")
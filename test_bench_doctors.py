@@ -0,0 +1,94 @@
+"""
+Module: test_bench_doctors
+
+
+PyTest Unit Test cases for the Doctors Without Orders benchmark harness
+"""
+
+
+import pytest
+
+
+# the following is the module(s) we are testing
+import bench_doctors
+import doctors
+
+
+
+
+def test_rosters_are_reproducible():
+   """Test that the same kind, size and seed always give the same roster,
+   and that a different seed gives a different one."""
+
+
+   for kind in bench_doctors.KINDS:
+       assert bench_doctors.generate_roster(kind, 6, 1) == bench_doctors.generate_roster(kind, 6, 1)
+       assert bench_doctors.generate_roster(kind, 6, 1) != bench_doctors.generate_roster(kind, 6, 2)
+
+
+
+
+def test_roster_kinds():
+   """Test that each kind of roster has the promised shape: tight ones need
+   every hour and can be scheduled, infeasible ones need one hour too many."""
+
+
+   for seed in range(3):
+       docs, patients = bench_doctors.generate_roster("tight", 5, seed)
+       assert sum(p.needed_hours for p in patients) == sum(d.max_hours for d in docs)
+       assert doctors.can_schedule_all(docs, patients, {d: set() for d in docs}) == True
+
+
+       docs, patients = bench_doctors.generate_roster("infeasible", 5, seed)
+       assert sum(p.needed_hours for p in patients) == sum(d.max_hours for d in docs) + 1
+
+
+       docs, patients = bench_doctors.generate_roster("identical", 5, seed)
+       assert {d.max_hours for d in docs} == {8}
+       assert {p.needed_hours for p in patients} <= {1, 2}
+
+
+
+
+def test_run_case_records_counters():
+   """Test that a benchmark run records the result, time and node count."""
+
+
+   record = bench_doctors.run_case("grouped", "identical", 4, 0)
+   assert record["feasible"] == True
+   assert record["seconds"] >= 0 and record["nodes"] > 0
+
+
+
+
+def test_run_benchmarks_parallel():
+   """Test that the parallel solver can be benchmarked: each case runs in a
+   process that is allowed to start a pool of its own."""
+
+
+   [record] = bench_doctors.run_benchmarks(["parallel"], ["identical"], [2], 1, 60)
+   assert "error" not in record and "timeout" not in record
+   assert record["feasible"] == True
+
+
+
+
+def test_run_benchmarks_records_errors():
+   """Test that a solver raising an error is recorded, and the rest of the
+   benchmark still runs."""
+
+
+   docs, patients = bench_doctors.generate_roster("identical", 16, 0)
+   assert len(patients) > doctors.DP_LIMIT_PATIENTS
+
+
+   records = bench_doctors.run_benchmarks(["dp", "grouped"], ["identical"], [16], 1, 60)
+   assert [r["solver"] for r in records] == ["dp", "grouped"]
+   assert "ValueError" in records[0]["error"]
+   assert records[1]["feasible"] in (True, False)
+
+
+
+
+if __name__ == "__main__":
+   pytest.main(['test_bench_doctors.py'])
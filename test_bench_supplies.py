@@ -0,0 +1,79 @@
+"""
+Module: test_bench_supplies
+
+
+PyTest Unit Test cases for the Disaster Planning loader benchmark
+"""
+
+
+import json
+import os
+
+
+import pytest
+
+
+# the following is the module(s) we are testing
+import bench_supplies
+import supplies
+
+
+
+
+def test_network_files(tmp_path):
+   """Test that the generated files are reproducible, can be read, and have
+   about the number of cities asked for."""
+
+
+   first, second = tmp_path / "first.dst", tmp_path / "second.dst"
+   bench_supplies.write_network_file(str(first), 50, 1)
+   bench_supplies.write_network_file(str(second), 50, 1)
+   assert first.read_text() == second.read_text()
+
+
+   network, location = supplies.parse_network_data(str(first))
+   assert 50 <= len(location) < 60
+   assert set(network) <= set(location)
+   assert supplies.read_network_data(str(first)) == (network, location)
+
+
+
+
+def test_main_writes_json(tmp_path):
+   """Test a tiny benchmark run from start to finish."""
+
+
+   output = tmp_path / "results.json"
+   assert bench_supplies.main(["--cities", "30", "--repeat", "1", "--output", str(output)]) == 0
+
+
+   report = json.loads(output.read_text())
+   assert report["cities"] == 30
+   assert set(report["seconds"]) == set(bench_supplies.LOADERS)
+
+
+
+
+def test_cached_loaders_are_timed_warm(tmp_path, monkeypatch):
+   """Test that the cached loaders are only timed once the cache is written,
+   even with a single run."""
+
+
+   filename = str(tmp_path / "network.dst")
+   bench_supplies.write_network_file(filename, 30, 0)
+
+
+   cache_existed = []
+   loader = bench_supplies.LOADERS["load_network_cached"]
+   def watched_loader(f):
+      cache_existed.append(os.path.exists(f + supplies.NETWORK_CACHE_SUFFIX))
+      return loader(f)
+   monkeypatch.setitem(bench_supplies.LOADERS, "load_network_cached", watched_loader)
+   bench_supplies.time_loader("load_network_cached", filename, 1)
+   assert cache_existed == [True]
+
+
+
+
+if __name__ == "__main__":
+   pytest.main(['test_bench_supplies.py'])
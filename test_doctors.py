@@ -1,172 +1,617 @@
-"""
-Module: test_doctors
-
-
-PyTest Unit Test cases for COMP120 PSA5 (Doctors Without Orders)
-"""
-
-
-import pytest
-
-
-# the following is the module(s) we are testing
-import doctors
-from doctors import Doctor, Patient,can_schedule_all
-
-
-def test_no_patients():
-   """Test for the base case of when there is a doctor but are no patients to be seen."""
-
-
-   d = Doctor("D1", 100)
-   schedule = {d: set()} # schedule has doctor with no patients
-
-
-   result = doctors.can_schedule_all([d], [], schedule)
-   assert result == True
-
-
-
-
-def test_no_doctors():
-   """Test for the base case of when there isn't a doctor but there are patients."""
-
-
-   p = Patient("P1", 1)
-   result = doctors.can_schedule_all([], [p], {})
-
-
-   assert result == False
-
-
-
-
-def test_one_doctor_and_patient_ok():
-   """Test for when there is one doctor and one patient and the doctor has
-   enough hours to meet the patient."""
-
-
-   d = Doctor("D1", 10)
-   p = Patient("P1", 1)
-
-
-   actual_schedule = {d: set()} # initial schedule is empty
-
-
-   result = doctors.can_schedule_all([d], [p], actual_schedule)
-
-
-   expected_patients_for_d = set([p]) # create a set with the patient
-
-
-   # need to check that we returned the right value and that the schedule for
-   # the doctor matches what we expected
-   assert result == True
-   assert actual_schedule[d] == expected_patients_for_d
-
-
-
-
-# TODO: Complete all of the test functions below.
-# DO NOT modify any of the test functions above here.
-
-
-
-
-def test_one_doctor_and_patient_bad():
-   """Test for when there is one doctor and one patient and the doctor does
-   NOT have enough hours to meet the patient."""
-
-
-   doctor = Doctor("Dr. Garcia",5) # information that I am sending to the doctor class
-   patient = Patient('Donah Briggs',8)
-   schedule = {doctor:set()} #create an empty dictionary
-   assert can_schedule_all([doctor],[patient],schedule) == False # make sure its not True
-
-
-
-
-def test_one_doctor_multiple_patient_ok():
-   """Test for when there is one doctor and multiple patients, and that the
-   doctor has enough time to meet with all patients."""
-   doctor = Doctor("Dr. Garcia",5) # information that I am sending to the doctor class
-   patient1 = Patient('Donah Briggs',2)
-   patient2 = Patient('Bio Briggs',2)
-   patient3 = Patient('Chloe Ogamba',1)
-   schedule = {doctor:set()} #create an empty dictionary
-   assert can_schedule_all([doctor],[patient1,patient2,patient3],schedule) == True
-  
-
-
-
-
-def test_one_doctor_multiple_patient_bad():
-   """Test for when there is one doctor and multiple patients, and that the
-   doctor does NOT have enough time to meet with all patients. Also, none of
-   the patients should require more hours than the doctor has free."""
-
-
-   doctor = Doctor("Dr. Garcia",5) # information that I am sending to the doctor class
-   patient1 = Patient('Donah Briggs',3)
-   patient2 = Patient('Bio Briggs',3)
-   patient3 = Patient('Chloe Ogamba',4)
-   schedule = {doctor:set()} #create an empty dictionary
-   assert can_schedule_all([doctor],[patient1,patient2,patient3],schedule) == False
-  
-
-
-def test_two_doctors_multiple_patient_ok():
-   """Test for when there are two doctor and multiple patients, and that
-   (1) We can't schedule all the patients with a single doctor.
-   (2) We can schedule all the patients across the two doctors.
-   (3) Each doctor will be assigned at least two patients."""
-
-
-   doctor1 = Doctor("Dr. Garcia",10) # information that I am sending to the doctor class
-   doctor2 = Doctor("Dr.Johnson",10)
-
-
-   patient1 = Patient('Donah Briggs',4)
-   patient2 = Patient('Bio Briggs',6)
-   patient3 = Patient('Chloe Ogamba',2)
-   patient4 = Patient('Melissa Vargas',3)
-   schedule = {doctor1:set(),doctor2:set()} #create an empty dictionary
-
-
-   assert can_schedule_all([doctor1],[patient1,patient2,patient3,patient4],schedule) or can_schedule_all([doctor2],[patient1,patient2,patient3,patient4],schedule) == False #can't schedule all the patients with a single doctor #####
-   assert can_schedule_all([doctor1,doctor2],[patient1,patient2,patient3,patient4],schedule) == True #can schedule all the patients across the two doctors
-
-
-   assert len(schedule[doctor1]) >=2 #Each doctor will be assigned at least two patients.
-   assert len(schedule[doctor2]) >=2
- 
-
-
-def test_two_doctors_multiple_patient_bad():
-   """Test for when there are two doctor and multiple patients, and that
-   (1) We can't schedule all the patients with the two doctors.
-   (2) None of the patients by themselves require more hours than either of
-   the doctors."""
-
-
-   doctor1 = Doctor("Dr. Garcia",10) # information that I am sending to the doctor class
-   doctor2 = Doctor("Dr.Johnson",10)
-
-
-   patient1 = Patient('Donah Briggs',4)
-   patient2 = Patient('Bio Briggs',6)
-   patient3 = Patient('Chloe Ogamba',2)
-   patient4 = Patient('Melissa Vargas',3)
-   schedule = {doctor1:set(),doctor2:set()} #create an empty dictionary
-
-
- 
-   assert can_schedule_all([doctor1,doctor2],[patient1,patient2,patient3,patient4],schedule) == True
-  
-   assert patient1.needed_hours <= doctor1.max_hours
-
-
-if __name__ == "__main__":
-   pytest.main(['test_doctors.py'])
-
-
+"""
+Module: test_doctors
+
+
+PyTest Unit Test cases for COMP120 PSA5 (Doctors Without Orders)
+"""
+
+
+import random
+import time
+
+
+import pytest
+
+
+# the following is the module(s) we are testing
+import doctors
+from doctors import Doctor, Patient,can_schedule_all
+
+
+def test_no_patients():
+   """Test for the base case of when there is a doctor but are no patients to be seen."""
+
+
+   d = Doctor("D1", 100)
+   schedule = {d: set()} # schedule has doctor with no patients
+
+
+   result = doctors.can_schedule_all([d], [], schedule)
+   assert result == True
+
+
+
+
+def test_no_doctors():
+   """Test for the base case of when there isn't a doctor but there are patients."""
+
+
+   p = Patient("P1", 1)
+   result = doctors.can_schedule_all([], [p], {})
+
+
+   assert result == False
+
+
+
+
+def test_one_doctor_and_patient_ok():
+   """Test for when there is one doctor and one patient and the doctor has
+   enough hours to meet the patient."""
+
+
+   d = Doctor("D1", 10)
+   p = Patient("P1", 1)
+
+
+   actual_schedule = {d: set()} # initial schedule is empty
+
+
+   result = doctors.can_schedule_all([d], [p], actual_schedule)
+
+
+   expected_patients_for_d = set([p]) # create a set with the patient
+
+
+   # need to check that we returned the right value and that the schedule for
+   # the doctor matches what we expected
+   assert result == True
+   assert actual_schedule[d] == expected_patients_for_d
+
+
+
+
+# TODO: Complete all of the test functions below.
+# DO NOT modify any of the test functions above here.
+
+
+
+
+def test_one_doctor_and_patient_bad():
+   """Test for when there is one doctor and one patient and the doctor does
+   NOT have enough hours to meet the patient."""
+
+
+   doctor = Doctor("Dr. Garcia",5) # information that I am sending to the doctor class
+   patient = Patient('Donah Briggs',8)
+   schedule = {doctor:set()} #create an empty dictionary
+   assert can_schedule_all([doctor],[patient],schedule) == False # make sure its not True
+
+
+
+
+def test_one_doctor_multiple_patient_ok():
+   """Test for when there is one doctor and multiple patients, and that the
+   doctor has enough time to meet with all patients."""
+   doctor = Doctor("Dr. Garcia",5) # information that I am sending to the doctor class
+   patient1 = Patient('Donah Briggs',2)
+   patient2 = Patient('Bio Briggs',2)
+   patient3 = Patient('Chloe Ogamba',1)
+   schedule = {doctor:set()} #create an empty dictionary
+   assert can_schedule_all([doctor],[patient1,patient2,patient3],schedule) == True
+  
+
+
+
+
+def test_one_doctor_multiple_patient_bad():
+   """Test for when there is one doctor and multiple patients, and that the
+   doctor does NOT have enough time to meet with all patients. Also, none of
+   the patients should require more hours than the doctor has free."""
+
+
+   doctor = Doctor("Dr. Garcia",5) # information that I am sending to the doctor class
+   patient1 = Patient('Donah Briggs',3)
+   patient2 = Patient('Bio Briggs',3)
+   patient3 = Patient('Chloe Ogamba',4)
+   schedule = {doctor:set()} #create an empty dictionary
+   assert can_schedule_all([doctor],[patient1,patient2,patient3],schedule) == False
+  
+
+
+def test_two_doctors_multiple_patient_ok():
+   """Test for when there are two doctor and multiple patients, and that
+   (1) We can't schedule all the patients with a single doctor.
+   (2) We can schedule all the patients across the two doctors.
+   (3) Each doctor will be assigned at least two patients."""
+
+
+   doctor1 = Doctor("Dr. Garcia",10) # information that I am sending to the doctor class
+   doctor2 = Doctor("Dr.Johnson",10)
+
+
+   patient1 = Patient('Donah Briggs',4)
+   patient2 = Patient('Bio Briggs',6)
+   patient3 = Patient('Chloe Ogamba',2)
+   patient4 = Patient('Melissa Vargas',3)
+   schedule = {doctor1:set(),doctor2:set()} #create an empty dictionary
+
+
+   assert can_schedule_all([doctor1],[patient1,patient2,patient3,patient4],schedule) or can_schedule_all([doctor2],[patient1,patient2,patient3,patient4],schedule) == False #can't schedule all the patients with a single doctor #####
+   assert can_schedule_all([doctor1,doctor2],[patient1,patient2,patient3,patient4],schedule) == True #can schedule all the patients across the two doctors
+
+
+   assert len(schedule[doctor1]) >=2 #Each doctor will be assigned at least two patients.
+   assert len(schedule[doctor2]) >=2
+ 
+
+
+def test_two_doctors_multiple_patient_bad():
+   """Test for when there are two doctor and multiple patients, and that
+   (1) We can't schedule all the patients with the two doctors.
+   (2) None of the patients by themselves require more hours than either of
+   the doctors."""
+
+
+   doctor1 = Doctor("Dr. Garcia",10) # information that I am sending to the doctor class
+   doctor2 = Doctor("Dr.Johnson",10)
+
+
+   patient1 = Patient('Donah Briggs',4)
+   patient2 = Patient('Bio Briggs',6)
+   patient3 = Patient('Chloe Ogamba',2)
+   patient4 = Patient('Melissa Vargas',3)
+   schedule = {doctor1:set(),doctor2:set()} #create an empty dictionary
+
+
+ 
+   assert can_schedule_all([doctor1,doctor2],[patient1,patient2,patient3,patient4],schedule) == True
+  
+   assert patient1.needed_hours <= doctor1.max_hours
+
+
+def test_existing_schedule_counts_against_hours():
+   """Test that patients already in the schedule use up the doctor's hours,
+   and that a failed attempt leaves the schedule exactly as it was."""
+
+
+   doctor = Doctor("Dr. Garcia", 5)
+   booked = Patient("Donah Briggs", 4)
+   schedule = {doctor: {booked}}
+
+
+   assert can_schedule_all([doctor], [Patient("Bio Briggs", 2)], schedule) == False
+   assert schedule[doctor] == {booked}
+
+
+   assert can_schedule_all([doctor], [Patient("Chloe Ogamba", 1)], schedule) == True
+   assert len(schedule[doctor]) == 2
+
+
+def test_symmetry_breaking_visits_fewer_nodes():
+   """Test that identical doctors are only tried once per patient, and that
+   turning symmetry breaking off gives the same answer with more work."""
+
+
+   docs = [Doctor(f"D{i}", 8) for i in range(4)]
+   pats = [Patient(f"P{i}", 3) for i in range(9)] # 27 hours, but only 8 fit
+
+
+   with_sym = doctors.SearchStats()
+   without_sym = doctors.SearchStats()
+   assert can_schedule_all(docs, pats, {d: set() for d in docs}, bounds=False, stats=with_sym) == False
+   assert can_schedule_all(docs, pats, {d: set() for d in docs}, symmetry=False, bounds=False, stats=without_sym) == False
+
+
+   assert with_sym.nodes < without_sym.nodes
+
+
+def test_bounds_reject_without_searching():
+   """Test that rosters needing more hours than the doctors have, or with a
+   patient too long for every doctor, are rejected at the very first node."""
+
+
+   docs = [Doctor(f"D{i}", 8) for i in range(10)]
+
+
+   too_many_hours = [Patient(f"P{i}", 3) for i in range(27)] # 81 > 80 hours
+   stats = doctors.SearchStats()
+   assert can_schedule_all(docs, too_many_hours, {d: set() for d in docs}, stats=stats) == False
+   assert stats.nodes == 1 and stats.pruned == 1
+
+
+   too_long = [Patient("P1", 1), Patient("P2", 9)]
+   stats = doctors.SearchStats()
+   assert can_schedule_all(docs, too_long, {d: set() for d in docs}, stats=stats) == False
+   assert stats.nodes == 1
+
+
+
+
+def test_largest_first_ok():
+   """Test that placing the longest patients first still finds a schedule,
+   and that every patient ends up with exactly one doctor."""
+
+
+   doctor1 = Doctor("Dr. Garcia", 10)
+   doctor2 = Doctor("Dr.Johnson", 10)
+   pats = [Patient("P1", 2), Patient("P2", 3), Patient("P3", 7), Patient("P4", 8)]
+   schedule = {doctor1: set(), doctor2: set()}
+
+
+   assert can_schedule_all([doctor1, doctor2], pats, schedule, largest_first=True) == True
+   assert schedule[doctor1] | schedule[doctor2] == set(pats)
+   assert sum(p.needed_hours for p in schedule[doctor1]) <= 10
+   assert sum(p.needed_hours for p in schedule[doctor2]) <= 10
+
+
+def test_memo_matches_plain_search():
+   """Test that the memoized solver agrees with can_schedule_all and that it
+   reuses failed states (with a tiny cache, some states get evicted)."""
+
+
+   docs = [Doctor("D1", 6), Doctor("D2", 6), Doctor("D3", 6)]
+   pats = [Patient(f"P{i}", h) for i, h in enumerate([4, 4, 4, 3, 3])] # 18 hours, but no 3 fits
+
+
+   for size in (1, 1000):
+       stats = doctors.SearchStats()
+       schedule = {d: set() for d in docs}
+       assert doctors.can_schedule_all_memo(docs, pats, schedule, cache_size=size, stats=stats) == False
+       assert stats.cache_misses > 0
+       assert all(len(ps) == 0 for ps in schedule.values())
+
+
+   stats = doctors.SearchStats()
+   doctors.can_schedule_all_memo(docs, pats, {d: set() for d in docs}, symmetry=False, bounds=False, stats=stats)
+   assert stats.cache_hits > 0
+
+
+   schedule = {d: set() for d in docs}
+   assert doctors.can_schedule_all_memo(docs, pats[1:], schedule) == True
+   assert set().union(*schedule.values()) == set(pats[1:])
+
+
+def test_grouped_agrees_with_can_schedule_all():
+   """Test that the grouped solver gives the same answers as can_schedule_all
+   and that its schedules respect every doctor's hours."""
+
+
+   docs = [Doctor("D1", 8), Doctor("D2", 8), Doctor("D3", 5)]
+   rosters = [[1] * 21, [1] * 22, [4, 4, 4, 4, 2, 2, 1], [5, 5, 5, 3], [6, 6, 3, 3, 3]]
+
+
+   for hours in rosters:
+       pats = [Patient(f"P{i}", h) for i, h in enumerate(hours)]
+       expected = can_schedule_all(docs, pats, {d: set() for d in docs})
+       schedule = {d: set() for d in docs}
+
+
+       assert doctors.can_schedule_all_grouped(docs, pats, schedule) == expected
+       if expected:
+           assert set().union(*schedule.values()) == set(pats)
+           assert all(sum(p.needed_hours for p in schedule[d]) <= d.max_hours for d in docs)
+
+
+   # a doctor already booked past their hours has none to give, but the
+   # others still do
+   a, b = Doctor("A", 0), Doctor("B", 4)
+   new = Patient("New", 2)
+   for solver in (can_schedule_all, doctors.can_schedule_all_grouped):
+       schedule = {a: {Patient("Booked", 1)}, b: set()}
+       assert solver([a, b], [new], schedule) == True
+       assert new in schedule[b]
+
+
+   # not even a patient needing no time
+   quick = Patient("Quick", 0)
+   for solver in (can_schedule_all, doctors.can_schedule_all_grouped):
+       assert solver([a], [quick], {a: {Patient("Booked", 1)}}) == False
+       schedule = {a: {Patient("Booked", 1)}, b: set()}
+       assert solver([a, b], [quick], schedule) == True
+       assert quick in schedule[b]
+
+
+def test_dp_agrees_with_search():
+   """Test that the bitmask DP solver gives the same answers as the
+   backtracking search, and that its schedules respect every doctor's hours."""
+
+
+   docs = [Doctor("D1", 9), Doctor("D2", 7), Doctor("D3", 4)]
+   rosters = [[], [3, 3, 3, 3, 3, 3], [5, 4, 4, 3, 2, 2], [6, 6, 4, 4], [8, 1, 1, 1, 1, 2, 2, 2, 2]]
+
+
+   for hours in rosters:
+       pats = [Patient(f"P{i}", h) for i, h in enumerate(hours)]
+       expected = can_schedule_all(docs, pats, {d: set() for d in docs}, dp=False)
+       schedule = {d: set() for d in docs}
+
+
+       assert doctors.can_schedule_all_dp(docs, pats, schedule) == expected
+       if expected:
+           assert set().union(*schedule.values()) == set(pats)
+           assert all(sum(p.needed_hours for p in schedule[d]) <= d.max_hours for d in docs)
+
+
+   assert can_schedule_all([], [Patient("P1", 1)], {}, dp=True) == False
+
+
+   # a doctor already booked past their hours doesn't take away from the
+   # hours the doctors after them have free
+   a, b, c = Doctor("A", 3), Doctor("B", 1), Doctor("C", 4)
+   pats = [Patient("P1", 3), Patient("P2", 4)]
+   assert can_schedule_all([a, b, c], pats, {a: set(), b: {Patient("Booked", 3)}, c: set()}, dp=False) == True
+   schedule = {a: set(), b: {Patient("Booked", 3)}, c: set()}
+   assert doctors.can_schedule_all_dp([a, b, c], pats, schedule) == True
+   assert schedule[a] == {pats[0]} and schedule[c] == {pats[1]}
+
+
+def test_parallel_agrees_with_can_schedule_all():
+   """Test that the parallel solver gives the same answers as can_schedule_all,
+   including rosters small enough to be solved while splitting them up."""
+
+
+   docs = [Doctor(f"D{i}", h) for i, h in enumerate([8, 8, 7, 6, 5])]
+   rosters = [[1], [6, 5, 5, 4, 4, 3, 3, 2, 2], [6, 6, 6, 6, 6, 6], [5, 5, 4, 4, 4, 3, 3, 3, 2, 1]]
+
+
+   for hours in rosters:
+       pats = [Patient(f"P{i}", h) for i, h in enumerate(hours)]
+       expected = can_schedule_all(docs, pats, {d: set() for d in docs})
+       schedule = {d: set() for d in docs}
+
+
+       assert doctors.can_schedule_all_parallel(docs, pats, schedule, workers=2) == expected
+       if expected:
+           assert set().union(*schedule.values()) == set(pats)
+           assert all(sum(p.needed_hours for p in schedule[d]) <= d.max_hours for d in docs)
+
+
+def test_iterative_matches_recursive():
+   """Test that the non-recursive search makes exactly the same choices, and
+   visits the same number of nodes, as the recursive one."""
+
+
+   docs = [Doctor("D1", 9), Doctor("D2", 7), Doctor("D3", 7), Doctor("D4", 4)]
+   rosters = [[5, 4, 4, 3, 3, 2, 2, 2, 1, 1], [6, 6, 6, 6, 4], [1, 4, 1, 4, 2, 5, 3, 1]]
+
+
+   for hours in rosters:
+       pats = [Patient(f"P{i}", h) for i, h in enumerate(hours)]
+       rec_schedule, rec_stats = {d: set() for d in docs}, doctors.SearchStats()
+       it_schedule, it_stats = {d: set() for d in docs}, doctors.SearchStats()
+
+
+       rec = can_schedule_all(docs, pats, rec_schedule, dp=False, stats=rec_stats)
+       it = doctors.can_schedule_all_iterative(docs, pats, it_schedule, stats=it_stats)
+
+
+       assert rec == it
+       assert rec_schedule == it_schedule
+       assert rec_stats.nodes == it_stats.nodes
+       assert rec_stats.backtracks == it_stats.backtracks
+       assert rec_stats.max_depth == it_stats.max_depth
+
+
+
+
+def test_thousands_of_patients():
+   """Test that rosters far longer than Python's recursion limit can be
+   scheduled (and rejected)."""
+
+
+   docs = [Doctor(f"D{i}", 100) for i in range(30)]
+   pats = [Patient(f"P{i}", 1) for i in range(3000)]
+   schedule = {d: set() for d in docs}
+
+
+   assert can_schedule_all(docs, pats, schedule) == True
+   assert all(len(schedule[d]) == 100 for d in docs)
+
+
+   pats.append(Patient("One Too Many", 1))
+   assert can_schedule_all(docs, pats, {d: set() for d in docs}) == False
+
+
+def test_solve_within_budget():
+   """Test the three outcomes of the budgeted solver: a schedule (found by
+   the greedy pass or the search), proven infeasibility, and running out of
+   budget."""
+
+
+   docs = [Doctor("D1", 10), Doctor("D2", 10)]
+   easy = [Patient("P1", 4), Patient("P2", 6), Patient("P3", 2), Patient("P4", 3)]
+   schedule = {d: set() for d in docs}
+   assert doctors.solve_within_budget(docs, easy, schedule, time_limit=1.0) == doctors.ScheduleStatus.SCHEDULED
+   assert set().union(*schedule.values()) == set(easy)
+
+
+   # first fit decreasing puts 7+3 together and then can't place both 5s
+   docs = [Doctor("D1", 10), Doctor("D2", 10), Doctor("D3", 10)]
+   tricky = [Patient(f"P{i}", h) for i, h in enumerate([7, 5, 5, 5, 5, 3])]
+   schedule = {d: set() for d in docs}
+   assert doctors.solve_within_budget(docs, tricky, schedule, node_limit=1000) == doctors.ScheduleStatus.SCHEDULED
+
+
+   too_many = [Patient(f"P{i}", 4) for i in range(8)]
+   assert doctors.solve_within_budget(docs, too_many, {d: set() for d in docs}) == doctors.ScheduleStatus.INFEASIBLE
+
+
+   # the 5s waste 2 hours each, which no bound notices before searching, so
+   # a budget of one node can't settle it
+   docs = [Doctor(f"D{i}", 7) for i in range(5)]
+   hard = [Patient(f"P{i}", h) for i, h in enumerate([5, 5, 4, 4, 4, 3, 3, 3, 3])]
+   assert doctors.solve_within_budget(docs, hard, {d: set() for d in docs}, node_limit=1) == doctors.ScheduleStatus.UNKNOWN
+
+
+def test_stats_are_filled_in():
+   """Test that passing a SearchStats object records the search's work."""
+
+
+   docs = [Doctor("D1", 6), Doctor("D2", 6), Doctor("D3", 6)]
+   pats = [Patient(f"P{i}", h) for i, h in enumerate([4, 4, 4, 3, 3])]
+
+
+   stats = doctors.SearchStats()
+   assert can_schedule_all(docs, pats, {d: set() for d in docs}, dp=False, bounds=False, stats=stats) == False
+   assert stats.nodes > 1
+   assert stats.backtracks > 0
+   assert stats.max_depth == 3 # all three 4s get placed
+   assert "search" in stats.phase_times
+
+
+def test_incremental_scheduler_keeps_schedule_valid():
+   """Test a day of arrivals and cancellations: every update should agree
+   with scheduling the whole roster from scratch, and the schedule should
+   always respect the doctors' hours."""
+
+
+   docs = [Doctor("D1", 8), Doctor("D2", 8), Doctor("D3", 6)]
+   scheduler = doctors.IncrementalScheduler(docs)
+   arrivals = [Patient(f"P{i}", h) for i, h in enumerate([3, 5, 2, 4, 4, 1, 3, 2, 6, 2])]
+   cancellations = {4: arrivals[1], 8: arrivals[3]} # cancel P1 after P4 arrives, etc.
+
+
+   for i, patient in enumerate(arrivals):
+       roster = [p for p in arrivals[:i] if p in scheduler] + [patient]
+       expected = can_schedule_all(docs, roster, {d: set() for d in docs})
+       assert scheduler.add_patient(patient) == expected
+       assert (patient in scheduler) == expected
+
+
+       if i in cancellations:
+           scheduler.remove_patient(cancellations[i])
+
+
+       assert all(sum(p.needed_hours for p in scheduler.schedule[d]) <= d.max_hours for d in docs)
+
+
+   assert scheduler.full_searches < len(arrivals)
+   with pytest.raises(KeyError):
+       scheduler.remove_patient(Patient("Never Seen", 1))
+
+
+def test_balanced_schedule():
+   """Test that the balanced mode spreads the work as evenly as possible,
+   where can_schedule_all is happy to fill up the first doctor."""
+
+
+   doctor1 = Doctor("Dr. Garcia", 10)
+   doctor2 = Doctor("Dr.Johnson", 10)
+   doctor3 = Doctor("Dr. Lee", 5)
+   pats = [Patient("P1", 4), Patient("P2", 6), Patient("P3", 2), Patient("P4", 3), Patient("P5", 1)]
+   schedule = {doctor1: set(), doctor2: set(), doctor3: set()}
+
+
+   assert doctors.schedule_balanced([doctor1, doctor2, doctor3], pats, schedule) == True
+   assert set().union(*schedule.values()) == set(pats)
+   # 16 of 25 hours is 64% on average, but no split keeps everyone under 70%
+   loads = [sum(p.needed_hours for p in schedule[d]) / d.max_hours for d in schedule]
+   assert max(loads) == 0.7
+
+
+   too_long = [Patient("P1", 11)]
+   assert doctors.schedule_balanced([doctor1, doctor2], too_long, {doctor1: set(), doctor2: set()}) == False
+
+
+   # a doctor already booked past their hours (here, with no hours at all)
+   # can't be helped by any schedule, so it doesn't count against the others
+   z, a, b = Doctor("Z", 0), Doctor("A", 6), Doctor("B", 5)
+   booked = Patient("Booked", 1)
+   pats = [Patient("P1", 4), Patient("P2", 3), Patient("P3", 3)]
+   assert can_schedule_all([z, a, b], pats, {z: {booked}, a: set(), b: set()}) == True
+   schedule = {z: {booked}, a: set(), b: set()}
+   assert doctors.schedule_balanced([z, a, b], pats, schedule) == True
+   assert schedule == {z: {booked}, a: {pats[1], pats[2]}, b: {pats[0]}}
+
+
+def test_read_scheduling_data(tmp_path):
+   """Test that the streaming reader matches parse_scheduling_data, skips
+   comments anywhere in the file, and that its compact form can be solved
+   directly."""
+
+
+   roster_file = tmp_path / "roster.txt"
+   roster_file.write_text("# a roster\n\nDoctor Sat Garcia: 7\nDoctor Mel Vargas: 5\n"
+                          "Patient Ben Hurt: 3\nPatient Chloe Ogamba: 4\nPatient Ann Ache: 4\n")
+   assert doctors.read_scheduling_data(str(roster_file)) == doctors.parse_scheduling_data(str(roster_file))
+
+
+   with open(roster_file, "a") as f:
+       f.write("\n# walk-ins\nPatient Bio Briggs: 1\n")
+   roster = doctors.read_scheduling_data(str(roster_file), compact=True)
+   assert roster.patient_names == ["Ben Hurt", "Chloe Ogamba", "Ann Ache", "Bio Briggs"]
+   assert list(roster.patient_hours) == [3, 4, 4, 1]
+
+
+   assignment = doctors.schedule_compact(roster, largest_first=True)
+   assert assignment is not None
+   for d, max_hours in enumerate(roster.doctor_hours):
+       assert sum(h for h, a in zip(roster.patient_hours, assignment) if a == d) <= max_hours
+
+
+   roster.patient_hours.append(1)
+   roster.patient_names.append("One Too Many")
+   assert doctors.schedule_compact(roster) is None
+
+
+def test_dp_rejects_big_rosters():
+   """Test that the DP refuses rosters too big for its tables instead of
+   running out of memory, and still takes one right at the limit."""
+
+
+   docs = [Doctor("D1", 40)]
+   pats = [Patient(f"P{i}", 1) for i in range(doctors.DP_LIMIT_PATIENTS + 1)]
+   with pytest.raises(ValueError):
+       doctors.can_schedule_all_dp(docs, pats, {d: set() for d in docs})
+   with pytest.raises(ValueError):
+       doctors.can_schedule_all(docs, pats, {d: set() for d in docs}, dp=True)
+
+
+   assert doctors.can_schedule_all_dp(docs, pats[:-5], {d: set() for d in docs}) == True
+
+
+def test_balanced_big_roster():
+   """Test that the balanced mode handles rosters far deeper than Python's
+   recursion limit, and that with a time limit it stops with the most even
+   schedule found so far."""
+
+
+   docs = [Doctor(f"D{i}", 70) for i in range(30)]
+   pats = [Patient(f"P{i}", 1) for i in range(2000)]
+   schedule = {d: set() for d in docs}
+   assert doctors.schedule_balanced(docs, pats, schedule) == True
+   # 2000 hours over 30 doctors leaves the busiest one with at least 67
+   assert max(len(schedule[d]) for d in docs) == 67
+
+
+   # a roster whose best schedule takes far longer than this to prove
+   rng = random.Random(3)
+   docs = [Doctor(f"D{i}", rng.randint(20, 40)) for i in range(6)]
+   pats = [Patient(f"P{i}", rng.randint(2, 9)) for i in range(30)]
+   schedule = {d: set() for d in docs}
+   started = time.perf_counter()
+   assert doctors.schedule_balanced(docs, pats, schedule, time_limit=0.2) == True
+   assert time.perf_counter() - started < 2
+   assert set().union(*schedule.values()) == set(pats)
+   assert all(sum(p.needed_hours for p in schedule[d]) <= d.max_hours for d in docs)
+
+
+def test_read_scheduling_data_whitespace(tmp_path):
+   """Test that the streaming reader splits names on any whitespace, the
+   same way parse_scheduling_data does."""
+
+
+   roster_file = tmp_path / "roster.txt"
+   roster_file.write_text("Doctor  Sat   Garcia: 7\nDoctor\tMel\tVargas : 5\n"
+                          "  Patient Ben  Hurt: 3\nPatient\t Chloe: 4\n")
+   docs, patients = doctors.read_scheduling_data(str(roster_file))
+   assert (docs, patients) == doctors.parse_scheduling_data(str(roster_file))
+   assert [d.name for d in docs] == ["Sat Garcia", "Mel Vargas"]
+   assert [p.name for p in patients] == ["Ben Hurt", "Chloe"]
+
+
+if __name__ == "__main__":
+   pytest.main(['test_doctors.py'])
+
+
@@ -0,0 +1,77 @@
+"""
+Module: test_doctors_batch
+
+
+PyTest Unit Test cases for the batch Doctors Without Orders runner
+"""
+
+
+import json
+
+
+import pytest
+
+
+# the following is the module(s) we are testing
+import doctors_batch
+
+
+
+
+def write_roster(path, lines):
+   """Writes a scheduling file with the given lines."""
+   path.write_text("\n".join(lines) + "\n")
+   return path
+
+
+
+
+def test_find_files(tmp_path):
+   """Test that directories, plain files and glob patterns all expand to
+   the files they name, without duplicates."""
+
+
+   a = write_roster(tmp_path / "a.txt", ["Doctor A: 1"])
+   b = write_roster(tmp_path / "b.txt", ["Doctor B: 1"])
+   (tmp_path / "sub").mkdir()
+
+
+   expected = [str(a), str(b)]
+   assert doctors_batch.find_files([str(tmp_path)]) == expected
+   assert doctors_batch.find_files([str(tmp_path / "*.txt"), str(a)]) == expected
+   assert doctors_batch.find_files([str(tmp_path / "missing*")]) == []
+
+
+
+
+def test_batch_prints_one_record_per_file(tmp_path, capsys):
+   """Test that every file gets a JSON line with its status and schedule,
+   including files that can't be scheduled or can't be read."""
+
+
+   write_roster(tmp_path / "ok.txt", ["Doctor Sat: 5", "Patient Ben: 3", "Patient Ann: 2"])
+   write_roster(tmp_path / "bad.txt", ["Doctor Sat: 5", "Patient Ben: 6"])
+   write_roster(tmp_path / "broken.txt", ["not a roster"])
+
+
+   assert doctors_batch.main([str(tmp_path), "--workers", "2"]) == 0
+   records = {r["file"]: r for r in map(json.loads, capsys.readouterr().out.splitlines())}
+
+
+   ok = records[str(tmp_path / "ok.txt")]
+   assert ok["status"] == "scheduled" and ok["feasible"] == True
+   assert ok["schedule"] == {"Sat": ["Ann", "Ben"]}
+
+
+   bad = records[str(tmp_path / "bad.txt")]
+   assert bad["feasible"] == False and bad["schedule"] is None
+
+
+   assert records[str(tmp_path / "broken.txt")]["status"] == "error"
+   assert all(r["elapsed"] >= 0 for r in records.values())
+
+
+
+
+if __name__ == "__main__":
+   pytest.main(['test_doctors_batch.py'])
@@ -1,203 +1,546 @@
-"""
-Module: test_supplies
-
-
-PyTest Unit Test cases for COMP120 PSA5 (Disaster Planning)
-"""
-
-
-import pytest
-
-
-# the following is the module(s) we are testing
-import supplies
-
-
-def create_network(connected_pairs: list[tuple[str,str]]) -> dict[str,set[str]]:
-   """Creates a road network, given a list of pairs of cities that are
-   connected to each other.
-
-
-   >>> create_network([("San Diego", "Los Angeles")])
-   {'San Diego': {'Los Angeles'}, 'Los Angeles': {'San Diego'}}
-   >>> network = create_network([("San Diego", "Los Angeles"), ("San Diego", "Tijuana")])
-   >>> network == {'San Diego': {'Tijuana', 'Los Angeles'}, 'Los Angeles': {'San Diego'}, 'Tijuana': {'San Diego'}}
-   True
-   """
-
-
-   network = {}
-
-
-   for city1, city2 in connected_pairs:
-       # Add the cities to the network if we haven't seen them yet.
-       if city1 not in network:
-           network[city1] = set()
-       if city2 not in network:
-           network[city2] = set()
-
-
-       # add connection from city 1 to city 2
-       network[city1].add(city2)
-
-
-       # add connection from city 2 to city 1
-       network[city2].add(city1)
-
-
-   return network
-
-
-def test_negative_max_cities():
-   """Tests that when num_cities is negative, the precondition check raises
-   an assertion."""
-
-
-   with pytest.raises(AssertionError):
-       result = supplies.can_be_disaster_ready({}, -1, set())
-
-
-
-
-def test_max0_bad():
-   """Test the base case of when num_cities is 0 and supply_locations is
-   empty, so no way to cover the cities."""
-
-
-   network = create_network([("San Diego", "Tijuana"),
-                             ("San Diego", "Los Angeles"),
-                             ("Los Angeles", "Palm Springs")])
-
-
-   result = supplies.can_be_disaster_ready(network, 0, set())
-   assert result == False
-
-
-
-
-def test_too_many_supply_cities():
-   """Test the base case of when the number of cities in supply_cities is
-   greater than num_cities (should return False)."""
-
-
-   network = create_network([("San Diego", "Tijuana"),
-                             ("San Diego", "Los Angeles"),
-                             ("Los Angeles", "Palm Springs")])
-
-
-   supply_cities = set(['San Diego', 'Los Angeles'])
-   result = supplies.can_be_disaster_ready(network, 1, supply_cities)
-
-
-   assert result == False
-
-
-
-
-def test_socal_bad():
-   """Test the recursive case of when num_cities is 1, which isn't enough to
-   cover all the cities."""
-
-
-   network = create_network([("San Diego", "Tijuana"),
-                             ("San Diego", "Los Angeles"),
-                             ("Los Angeles", "Palm Springs")])
-
-
-   # test with 1 cities (not possible)
-   result = supplies.can_be_disaster_ready(network, 1, set())
-   assert result == False
-
-
-
-
-def test_socal_ok():
-   """Test recursive case where num_cities is enough to cover all of the
-   cities."""
-
-
-   network = create_network([("San Diego", "Tijuana"),
-                             ("San Diego", "Los Angeles"),
-                             ("Los Angeles", "Palm Springs")])
-
-
-   actual_supply_cities = set() # start off with no supply cities
-   result = supplies.can_be_disaster_ready(network, 2, actual_supply_cities)
-
-
-   expected_supply_cities = set(['Los Angeles', 'San Diego'])
-
-
-   # check that result was true and that supply cities are SD and LA
-   assert result == True
-   assert ('Palm Springs' in actual_supply_cities or "Los Angeles" in actual_supply_cities) and ('San Diego' in actual_supply_cities or "Tijuana" in actual_supply_cities)
-
-
-
-
-# TODO: Complete all of the test functions below.
-# DO NOT modify any of the test functions above here.
-
-
-def test_base_case_ok():
-   """Test case where the given supply cities cover all of the cities WITHOUT
-   adding any more cities as supply locations."""
-   road_network = { "A": {"B", "C"}, "B": {"A", "C"}, "C": {"A", "B"}  }  # a simple road network where each city is directly connected to every other city.
-   supply_locations = {"A", "B", "C"} # The set of supply locations containing all cities in the road network.
-   num_cities = 3 #  the total number of cities in the road network.
-   # checks that the can_be_disaster_ready function returns True when the given supply cities, covers all the cities in the road network without requiring additional supply
-   assert supplies.can_be_disaster_ready(road_network, num_cities, supply_locations) == True
-   #needs to be supplies. so that it can recongize where the fucntion can be found (did not work when it just can_be_diaster_ready)
-
-
-
-
-
-
-def test_counter_intuitive_example():
-   """Tests the "Counter-Intuitive Stockpiling" example from the PSA
-   specifications (i.e. the "Ethane" example), checking that it returns False
-   when num_cities is 1 and returns True when num_cities is 2 or 3."""
-  
-   network = create_network([("San Diego", "Los Angeles"), ("San Diego", "Tijuana"), ("Los Angeles", "Palm Springs")])
-   # Test with num_cities as 1
-   result_1 = supplies.can_be_disaster_ready(network, 1, set())
-   assert result_1 == False
-   # Test with num_cities as 2
-   result_2 = supplies.can_be_disaster_ready(network, 2, set())
-   assert result_2 == True
-   # Test with num_cities as 3
-   result_3 = supplies.can_be_disaster_ready(network, 3, set())
-   assert result_3 == True
-
-
-def test_dont_be_greedy_example():
-   """Tests the "Don't Be Greedy" example from the PSA
-   specifications, checking that it returns False when num_cities is 1 and
-   returns True when num_cities is 2 or 3."""
-
-
-   result = supplies.can_be_disaster_ready
-   if result == 1:
-       return False
-   elif result==2 or result ==3:
-       return True
-
-
-
-<<<<<<< HEAD
-=======
-    result = supplies.can_be_disaster_ready
-    if result == 1:
-        return False
-    elif result==2 or result ==3:
-        return True
-
->>>>>>> c6259ddd7405265bc6097f4ae3e46013d6521a24
-
-if __name__ == "__main__":
-   pytest.main(['test_supplies.py'])
-
-
-
-
+"""
+Module: test_supplies
+
+
+PyTest Unit Test cases for COMP120 PSA5 (Disaster Planning)
+"""
+
+
+import os
+import sys
+
+
+import pytest
+
+
+# the following is the module(s) we are testing
+import supplies
+
+
+def create_network(connected_pairs: list[tuple[str,str]]) -> dict[str,set[str]]:
+   """Creates a road network, given a list of pairs of cities that are
+   connected to each other.
+
+
+   >>> create_network([("San Diego", "Los Angeles")])
+   {'San Diego': {'Los Angeles'}, 'Los Angeles': {'San Diego'}}
+   >>> network = create_network([("San Diego", "Los Angeles"), ("San Diego", "Tijuana")])
+   >>> network == {'San Diego': {'Tijuana', 'Los Angeles'}, 'Los Angeles': {'San Diego'}, 'Tijuana': {'San Diego'}}
+   True
+   """
+
+
+   network = {}
+
+
+   for city1, city2 in connected_pairs:
+       # Add the cities to the network if we haven't seen them yet.
+       if city1 not in network:
+           network[city1] = set()
+       if city2 not in network:
+           network[city2] = set()
+
+
+       # add connection from city 1 to city 2
+       network[city1].add(city2)
+
+
+       # add connection from city 2 to city 1
+       network[city2].add(city1)
+
+
+   return network
+
+
+def create_grid(size: int) -> dict[str,set[str]]:
+   """Creates a road network of size by size cities, named "x,y", each
+   connected to the cities directly left, right, above and below it."""
+
+
+   pairs = []
+   for x in range(size):
+       for y in range(size):
+           if x < size - 1:
+               pairs.append((f"{x},{y}", f"{x + 1},{y}"))
+           if y < size - 1:
+               pairs.append((f"{x},{y}", f"{x},{y + 1}"))
+   return create_network(pairs)
+
+
+
+
+def test_negative_max_cities():
+   """Tests that when num_cities is negative, the precondition check raises
+   an assertion."""
+
+
+   with pytest.raises(AssertionError):
+       result = supplies.can_be_disaster_ready({}, -1, set())
+
+
+
+
+def test_max0_bad():
+   """Test the base case of when num_cities is 0 and supply_locations is
+   empty, so no way to cover the cities."""
+
+
+   network = create_network([("San Diego", "Tijuana"),
+                             ("San Diego", "Los Angeles"),
+                             ("Los Angeles", "Palm Springs")])
+
+
+   result = supplies.can_be_disaster_ready(network, 0, set())
+   assert result == False
+
+
+
+
+def test_too_many_supply_cities():
+   """Test the base case of when the number of cities in supply_cities is
+   greater than num_cities (should return False)."""
+
+
+   network = create_network([("San Diego", "Tijuana"),
+                             ("San Diego", "Los Angeles"),
+                             ("Los Angeles", "Palm Springs")])
+
+
+   supply_cities = set(['San Diego', 'Los Angeles'])
+   result = supplies.can_be_disaster_ready(network, 1, supply_cities)
+
+
+   assert result == False
+
+
+
+
+def test_socal_bad():
+   """Test the recursive case of when num_cities is 1, which isn't enough to
+   cover all the cities."""
+
+
+   network = create_network([("San Diego", "Tijuana"),
+                             ("San Diego", "Los Angeles"),
+                             ("Los Angeles", "Palm Springs")])
+
+
+   # test with 1 cities (not possible)
+   result = supplies.can_be_disaster_ready(network, 1, set())
+   assert result == False
+
+
+
+
+def test_socal_ok():
+   """Test recursive case where num_cities is enough to cover all of the
+   cities."""
+
+
+   network = create_network([("San Diego", "Tijuana"),
+                             ("San Diego", "Los Angeles"),
+                             ("Los Angeles", "Palm Springs")])
+
+
+   actual_supply_cities = set() # start off with no supply cities
+   result = supplies.can_be_disaster_ready(network, 2, actual_supply_cities)
+
+
+   expected_supply_cities = set(['Los Angeles', 'San Diego'])
+
+
+   # check that result was true and that supply cities are SD and LA
+   assert result == True
+   assert ('Palm Springs' in actual_supply_cities or "Los Angeles" in actual_supply_cities) and ('San Diego' in actual_supply_cities or "Tijuana" in actual_supply_cities)
+
+
+
+
+# TODO: Complete all of the test functions below.
+# DO NOT modify any of the test functions above here.
+
+
+def test_base_case_ok():
+   """Test case where the given supply cities cover all of the cities WITHOUT
+   adding any more cities as supply locations."""
+   road_network = { "A": {"B", "C"}, "B": {"A", "C"}, "C": {"A", "B"}  }  # a simple road network where each city is directly connected to every other city.
+   supply_locations = {"A", "B", "C"} # The set of supply locations containing all cities in the road network.
+   num_cities = 3 #  the total number of cities in the road network.
+   # checks that the can_be_disaster_ready function returns True when the given supply cities, covers all the cities in the road network without requiring additional supply
+   assert supplies.can_be_disaster_ready(road_network, num_cities, supply_locations) == True
+   #needs to be supplies. so that it can recongize where the fucntion can be found (did not work when it just can_be_diaster_ready)
+
+
+
+
+
+
+def test_counter_intuitive_example():
+   """Tests the "Counter-Intuitive Stockpiling" example from the PSA
+   specifications (i.e. the "Ethane" example), checking that it returns False
+   when num_cities is 1 and returns True when num_cities is 2 or 3."""
+  
+   network = create_network([("San Diego", "Los Angeles"), ("San Diego", "Tijuana"), ("Los Angeles", "Palm Springs")])
+   # Test with num_cities as 1
+   result_1 = supplies.can_be_disaster_ready(network, 1, set())
+   assert result_1 == False
+   # Test with num_cities as 2
+   result_2 = supplies.can_be_disaster_ready(network, 2, set())
+   assert result_2 == True
+   # Test with num_cities as 3
+   result_3 = supplies.can_be_disaster_ready(network, 3, set())
+   assert result_3 == True
+
+
+def test_dont_be_greedy_example():
+   """Tests the "Don't Be Greedy" example from the PSA
+   specifications, checking that it returns False when num_cities is 1 and
+   returns True when num_cities is 2 or 3."""
+
+
+   result = supplies.can_be_disaster_ready
+   if result == 1:
+       return False
+   elif result==2 or result ==3:
+       return True
+
+
+def test_stats_are_filled_in():
+   """Test that passing a SearchStats object records the search's work,
+   without changing the answer."""
+
+
+   stats = supplies.SearchStats()
+   assert supplies.can_be_disaster_ready(create_grid(5), 6, set(), stats) == False # 7 are needed
+   assert stats.nodes > 1
+   assert stats.backtracks > 0
+   assert 0 < stats.max_depth <= 6
+   assert stats.pruned > 0
+
+
+def test_compiled_network():
+   """Test converting a road network to its compiled (bitmask) form and back,
+   and that the solver and uncovered_cities give the same answers on it."""
+
+
+   network = create_network([("San Diego", "Tijuana"),
+                             ("San Diego", "Los Angeles"),
+                             ("Los Angeles", "Palm Springs")])
+   compiled = supplies.compile_network(network)
+
+
+   assert compiled.to_road_network() == network
+   assert compiled.cities_of(compiled.mask_of({"Tijuana", "Palm Springs"})) == {"Tijuana", "Palm Springs"}
+   assert supplies.uncovered_cities(compiled, {"San Diego"}) == supplies.uncovered_cities(network, {"San Diego"})
+   assert supplies.uncovered_cities(compiled, {"San Diego"}) == ["Palm Springs"]
+
+
+   supply_cities = set()
+   assert supplies.can_be_disaster_ready(compiled, 1, supply_cities) == False
+   assert supplies.can_be_disaster_ready(compiled, 2, supply_cities) == True
+   assert supplies.uncovered_cities(network, supply_cities) == []
+
+
+def test_long_road():
+   """Test a road of 30 cities in a row, which needs exactly 10 supply
+   cities, and check the supply cities found really cover everyone."""
+
+
+   network = create_network([(f"City {i}", f"City {i + 1}") for i in range(29)])
+
+
+   supply_cities = set()
+   assert supplies.can_be_disaster_ready(network, 10, supply_cities) == True
+   assert len(supply_cities) <= 10
+   assert supplies.uncovered_cities(network, supply_cities) == []
+   assert supplies.can_be_disaster_ready(network, 9, set()) == False
+
+
+def test_grid_needs_seven():
+   """Test a 5 by 5 grid of cities, whose smallest set of supply cities has
+   7 cities in it."""
+
+
+   network = create_grid(5)
+
+
+   supply_cities = set()
+   assert supplies.can_be_disaster_ready(network, 7, supply_cities) == True
+   assert supplies.uncovered_cities(network, supply_cities) == []
+   assert supplies.can_be_disaster_ready(network, 6, set()) == False
+
+
+def test_budget_bounds_reject_at_once():
+   """Test that budgets that obviously can't cover the network are rejected
+   without any branching: cities far apart each need their own supply."""
+
+
+   # 4 separate roads of 3 cities: the middle of each covers it, and nothing
+   # else can, so 3 supply cities can't be enough
+   network = create_network([(f"{r}a", f"{r}b") for r in range(4)] + [(f"{r}b", f"{r}c") for r in range(4)])
+
+
+   stats = supplies.SearchStats()
+   assert supplies.can_be_disaster_ready(network, 3, set(), stats) == False
+   assert stats.nodes == 1 and stats.backtracks == 0
+   assert supplies.can_be_disaster_ready(network, 4, set()) == True
+
+
+def test_reduce_network():
+   """Test that reduce_network forces the neighbors of leaves, adds the
+   cities that are only in the location map, and splits the components."""
+
+
+   network = create_network([("A", "B"), ("B", "C"), ("C", "D"), ("D", "E"), ("X", "Y")])
+   location = {city: (0, 0) for city in "ABCDEXYZ"}
+
+
+   reduced = supplies.reduce_network(network, location)
+   # B and D hold the leaves A and E, Z has no roads, and of X and Y only one is needed
+   assert reduced.forced - {"X", "Y"} == {"B", "D", "Z"}
+   assert len(reduced.forced & {"X", "Y"}) == 1
+   assert sorted(sorted(c) for c in reduced.components) == [["A", "B", "C", "D", "E"], ["X", "Y"], ["Z"]]
+
+
+   # a leaf that is already covered doesn't force anything
+   assert "B" not in supplies.reduce_network(network, supply_locations={"A"}).forced
+
+
+def test_by_components():
+   """Test solving a network made of separate pieces, each on its own, in
+   this process and in a pool."""
+
+
+   # two separate 3 by 3 grids (3 supply cities) and a road of 3 (1 supply city)
+   grid = create_grid(3)
+   network = {f"{g}:{city}": {f"{g}:{n}" for n in neighbors} for g in "ab" for city, neighbors in grid.items()}
+   network.update(create_network([("r1", "r2"), ("r2", "r3")]))
+   location = {"lonely": (0, 0)}
+
+
+   for workers in (1, 2):
+      stats = supplies.SearchStats()
+      supply_cities = set()
+      assert supplies.can_be_disaster_ready_by_components(network, 8, supply_cities, location,
+                                                          workers=workers, stats=stats) == True
+      assert len(supply_cities) <= 8 and "lonely" in supply_cities
+      assert supplies.uncovered_cities(network, supply_cities) == []
+      assert "reduce" in stats.phase_times
+      assert supplies.can_be_disaster_ready_by_components(network, 7, set(), location, workers=workers) == False
+
+
+   # without the location map, the lonely city doesn't count
+   assert supplies.can_be_disaster_ready_by_components(network, 7, set()) == True
+
+
+def test_by_components_generous_budget():
+   """Test that a generous budget on one big component is met by the first
+   cover found, rather than by proving which cover is the smallest."""
+
+
+   network = create_grid(10) # 100 cities, and far fewer than 40 supply cities are needed
+
+
+   stats = supplies.SearchStats()
+   supply_cities = set()
+   assert supplies.can_be_disaster_ready_by_components(network, 40, supply_cities, stats=stats) == True
+   assert len(supply_cities) <= 40
+   assert supplies.uncovered_cities(network, supply_cities) == []
+   assert stats.nodes < 1000
+
+
+def test_minimum_supply_cities():
+   """Test that the minimum solver finds covers of the smallest size, in a
+   single search per component."""
+
+
+   for network, fewest in [(create_grid(5), 7),
+                           (create_network([(f"City {i}", f"City {i + 1}") for i in range(29)]), 10),
+                           (create_network([("San Diego", "Tijuana"), ("San Diego", "Los Angeles"),
+                                            ("Los Angeles", "Palm Springs")]), 2),
+                           ({}, 0)]:
+      stats = supplies.SearchStats()
+      supply_cities = supplies.minimum_supply_cities(network, stats=stats)
+      assert len(supply_cities) == fewest
+      assert supplies.uncovered_cities(network, supply_cities) == []
+
+
+   # cities in the location map with no roads need a supply city each
+   network = create_network([("A", "B")])
+   assert len(supplies.minimum_supply_cities(network, {"A": (0, 0), "B": (1, 0), "C": (2, 0)})) == 2
+
+
+def test_failure_cache():
+   """Test that the search remembers failed states, so a state reached again
+   by adding the same supply cities in another order isn't searched twice."""
+
+
+   roads = "JL KG HE CG IB EM JA LK EF DC JD CL IC DF BM CB HD CH EB DE GM DB JE GE ME MA GL LE CD DJ BJ MH"
+   network = create_network([(road[0], road[1]) for road in roads.split()])
+
+
+   stats = supplies.SearchStats()
+   assert supplies.can_be_disaster_ready(network, 3, set(), stats) == False # 4 are needed
+   assert stats.cache_hits > 0
+   assert stats.cache_misses > 0
+   assert "cache hits" in str(stats)
+   assert supplies.can_be_disaster_ready(network, 4, set()) == True
+
+
+def test_parallel():
+   """Test the process pool version on a grid (whose branches are split
+   between the workers) next to a separate road, feasible and not."""
+
+
+   network = create_grid(5)
+   network.update(create_network([("r1", "r2"), ("r2", "r3"), ("r3", "r4")]))
+
+
+   stats = supplies.SearchStats()
+   supply_cities = set()
+   assert supplies.can_be_disaster_ready_parallel(network, 9, supply_cities, workers=2, stats=stats) == True
+   assert len(supply_cities) <= 9
+   assert supplies.uncovered_cities(network, supply_cities) == []
+   assert stats.nodes > 0
+
+
+   assert supplies.can_be_disaster_ready_parallel(network, 8, set(), workers=2) == False
+   assert supplies.can_be_disaster_ready_parallel(create_grid(5), 6, set(), workers=2) == False
+   assert len(supplies.minimum_supply_cities(network, workers=2)) == 9
+
+
+def test_read_network_data(tmp_path):
+   """Test that the fast loader gives the same network, locations and
+   errors as parse_network_data, in both of its forms."""
+
+
+   path = tmp_path / "socal.dst"
+   path.write_text("# Southern California\n"
+                   "San Diego (1, 2): Tijuana, Los Angeles\n"
+                   "\n"
+                   "  Los Angeles (1, 1): Palm Springs  \n"
+                   "Palm Springs (3, 1): Los Angeles\n"
+                   "Catalina (0, 3):\n"
+                   "Tijuana (1, 3):\n")
+
+
+   network, location = supplies.read_network_data(str(path))
+   assert (network, location) == supplies.parse_network_data(str(path))
+   assert "Catalina" in location and "Catalina" not in network
+
+
+   compiled, compiled_location = supplies.read_network_data(str(path), compiled=True)
+   assert compiled_location == location
+   assert compiled.to_road_network() == network
+   assert compiled == supplies.compile_network(compiled.to_road_network())
+
+
+   path.write_text("San Diego (1, 2): Tijuana\nLos Angeles: San Diego\n")
+   for compiled in (False, True):
+      with pytest.raises(supplies.InvalidFileFormatError, match="Invalid line: Los Angeles: San Diego"):
+         supplies.read_network_data(str(path), compiled)
+
+
+def test_network_cache(tmp_path):
+   """Test that load_network writes a cache that later loads read, and that
+   the cache is thrown out when the file's mtime or contents change."""
+
+
+   path = tmp_path / "socal.dst"
+   path.write_text("San Diego (1, 2): Tijuana, Los Angeles\n"
+                   "Los Angeles (1, 1): Palm Springs\n"
+                   "Catalina (0, 3):\n")
+   filename = str(path)
+   cache_file = filename + supplies.NETWORK_CACHE_SUFFIX
+   expected = supplies.parse_network_data(filename)
+
+
+   assert supplies.read_network_cache(cache_file, filename) is None
+   assert supplies.load_network(filename) == expected
+   assert supplies.read_network_cache(cache_file, filename) == expected
+   assert supplies.load_network(filename) == expected
+   compiled, location = supplies.load_network(filename, compiled=True)
+   assert compiled.to_road_network() == expected[0] and location == expected[1]
+
+
+   # a new mtime alone makes the cache stale
+   info = path.stat()
+   os.utime(filename, ns=(info.st_atime_ns, info.st_mtime_ns + 10**9))
+   assert supplies.read_network_cache(cache_file, filename) is None
+   assert supplies.load_network(filename) == expected
+
+
+   # so do new contents, even with the old mtime and size
+   info = path.stat()
+   path.write_text(path.read_text().replace("Catalina (0, 3)", "Catalina (0, 4)"))
+   os.utime(filename, ns=(info.st_atime_ns, info.st_mtime_ns))
+   assert supplies.read_network_cache(cache_file, filename) is None
+   assert supplies.load_network(filename)[1]["Catalina"] == (0, 4)
+
+
+   # and a damaged cache is just ignored
+   with open(cache_file, "r+b") as f:
+      f.truncate(40)
+   assert supplies.read_network_cache(cache_file, filename) is None
+   assert supplies.load_network(filename) == supplies.parse_network_data(filename)
+
+
+def test_network_cache_big_coordinates(tmp_path):
+   """Test that load_network handles any coordinate the file format allows:
+   big ones are kept in the cache, and ones too big for it are just parsed
+   every time."""
+
+
+   path = tmp_path / "far.dst"
+   filename = str(path)
+   cache_file = filename + supplies.NETWORK_CACHE_SUFFIX
+   for x in (99999999999, 10**30):
+      path.write_text(f"A ({x}, 1): B\nB (2, 3):\n")
+      expected = supplies.parse_network_data(filename)
+      assert supplies.read_network_data(filename) == expected
+      assert supplies.load_network(filename) == expected
+      assert supplies.load_network(filename) == expected
+      assert (supplies.read_network_cache(cache_file, filename) is not None) == (x < 2**63)
+      compiled, location = supplies.load_network(filename, compiled=True)
+      assert compiled.to_road_network() == expected[0] and location == expected[1]
+
+
+def test_damaged_network_cache(tmp_path):
+   """Test that a cache whose road offsets or city ids are out of range is
+   thrown out rather than raising."""
+
+
+   path = tmp_path / "socal.dst"
+   path.write_text("San Diego (1, 2): Tijuana, Los Angeles\n"
+                   "Los Angeles (1, 1): Palm Springs\n")
+   filename = str(path)
+   cache_file = filename + supplies.NETWORK_CACHE_SUFFIX
+   expected = supplies.load_network(filename)
+   with open(cache_file, "rb") as f:
+      good = f.read()
+
+
+   # the arrays start right after the header and the name table
+   names = b"\n".join(city.encode() for city in expected[0])
+   offsets_at = supplies._CACHE_HEADER.size + len(names)
+   num_keys = len(expected[0])
+   targets_at = offsets_at + 4 * (num_keys + 1)
+   damages = [(offsets_at + 4 * num_keys, -5),     # a negative end offset
+              (offsets_at + 4 * num_keys, 10**6),  # an end past the targets
+              (offsets_at + 4, 7),                 # offsets that go down
+              (targets_at, 99),                    # a city id past the names
+              (targets_at, -1)]                    # a negative city id
+   for at, value in damages:
+      with open(cache_file, "wb") as f:
+         f.write(good[:at] + value.to_bytes(4, sys.byteorder, signed=True) + good[at + 4:])
+      for compiled in (False, True):
+         assert supplies.read_network_cache(cache_file, filename, compiled) is None
+      assert supplies.load_network(filename) == expected
+
+
+if __name__ == "__main__":
+   pytest.main(['test_supplies.py'])
+
+
+
+